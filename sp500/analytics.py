@@ -0,0 +1,163 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import benchmark
+import results
+
+# Vectorized performance analytics.
+#
+# Everything works on a months x strategies matrix of monthly returns
+# (fractions, NaN where a strategy has no return that month), so each
+# metric is one pass of numpy over the whole matrix however many sweep
+# configurations it holds. Months are holding months, i.e. the month after
+# formation, which is what the benchmark's monthly returns are aligned to.
+#
+#   python analytics.py sweep.arrow --sort sharpe --top 20
+#   python analytics.py mom10_comb.csv
+PERIODS = 12
+
+
+def return_matrix(path, **where):
+    """(holding months, strategy parameters frame, months x strategies returns) from a results file."""
+    results_df, keys = results.returns_frame(path, **where)
+    formation = results_df["formation_month"].to_numpy().astype("datetime64[M]")
+    if keys:
+        codes, strategies = pd.MultiIndex.from_frame(results_df[keys]).factorize(sort=True)
+        strategies = pd.DataFrame(strategies.tolist(), columns=keys)
+    else:
+        codes = np.zeros(len(results_df), dtype=np.intp)
+        strategies = pd.DataFrame({"strategy": [path]})
+
+    holding = formation + 1
+    months, rows = np.unique(holding, return_inverse=True)
+    matrix = np.full((len(months), len(strategies)), np.nan)
+    matrix[rows, codes] = results_df["portfolio_return"].to_numpy(dtype=np.float64)
+    return months, strategies, matrix
+
+
+def _count(returns):
+    return np.isfinite(returns).sum(axis=0)
+
+
+def annualized_return(returns, periods=PERIODS):
+    """Geometric annual return over each column's observed months."""
+    n = _count(returns)
+    log_growth = np.nansum(np.log1p(returns), axis=0)
+    return np.where(n > 0, np.expm1(log_growth * periods / np.maximum(n, 1)), np.nan)
+
+
+def annualized_vol(returns, periods=PERIODS):
+    return np.nanstd(returns, axis=0, ddof=1) * np.sqrt(periods)
+
+
+def sharpe(returns, risk_free=0.0, periods=PERIODS):
+    """Annualized Sharpe ratio; `risk_free` is an annual rate."""
+    excess = returns - risk_free / periods
+    deviation = np.nanstd(excess, axis=0, ddof=1)
+    return np.where(deviation > 0, np.nanmean(excess, axis=0) / deviation * np.sqrt(periods), np.nan)
+
+
+def sortino(returns, risk_free=0.0, periods=PERIODS):
+    """Annualized Sortino ratio against downside deviation below the risk-free rate.
+
+    NaN for a column without a month below it, rather than an infinite
+    ratio that would rank first.
+    """
+    excess = returns - risk_free / periods
+    downside = np.sqrt(np.nanmean(np.minimum(excess, 0) ** 2, axis=0))
+    return np.where(downside > 0, np.nanmean(excess, axis=0) / downside * np.sqrt(periods), np.nan)
+
+
+def drawdowns(returns):
+    """(max drawdown, longest drawdown in months) of each column; missing months count as flat.
+
+    Wealth starts at 1 before the first month, so a loss in the first
+    month is a drawdown from the starting capital.
+    """
+    wealth = np.cumprod(1 + np.nan_to_num(returns), axis=0)
+    drawdown = wealth / np.maximum(np.maximum.accumulate(wealth, axis=0), 1) - 1
+
+    # Months since the last high, via the running index of the last row at a
+    # peak; -1 is the starting capital
+    index = np.arange(len(returns))[:, None]
+    last_peak = np.maximum.accumulate(np.where(drawdown < 0, -1, index), axis=0)
+    duration = (index - last_peak).max(axis=0, initial=0)
+    return drawdown.min(axis=0, initial=0), duration
+
+
+def hit_rate(returns):
+    n = _count(returns)
+    return np.where(n > 0, (returns > 0).sum(axis=0) / np.maximum(n, 1), np.nan)
+
+
+def relative(returns, bench_returns, periods=PERIODS):
+    """Beta, annualized alpha, tracking error and information ratio against a benchmark column."""
+    bench = np.broadcast_to(np.asarray(bench_returns, dtype=np.float64)[:, None], returns.shape)
+    both = np.isfinite(returns) & np.isfinite(bench)
+    r = np.where(both, returns, np.nan)
+    b = np.where(both, bench, np.nan)
+
+    r_mean, b_mean = np.nanmean(r, axis=0), np.nanmean(b, axis=0)
+    n = both.sum(axis=0)
+    covariance = np.nansum((r - r_mean) * (b - b_mean), axis=0) / np.maximum(n - 1, 1)
+    variance = np.nansum((b - b_mean) ** 2, axis=0) / np.maximum(n - 1, 1)
+    beta = covariance / variance
+    alpha = (r_mean - beta * b_mean) * periods
+
+    active = r - b
+    tracking_error = np.nanstd(active, axis=0, ddof=1) * np.sqrt(periods)
+    information_ratio = np.nanmean(active, axis=0) * periods / tracking_error
+    return beta, alpha, tracking_error, information_ratio
+
+
+def summary(returns, months=None, bench_returns=None, strategies=None, risk_free=0.0, periods=PERIODS):
+    """One row of metrics per strategy column.
+
+    Benchmark-relative metrics use `bench_returns` (one per month row), by
+    default the cached SPY series on `months`.
+    """
+    if bench_returns is None and months is not None:
+        bench_returns = benchmark.load().month_returns(months)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        max_drawdown, drawdown_months = drawdowns(returns)
+        table = {
+            "months": _count(returns),
+            "ann_return": annualized_return(returns, periods),
+            "ann_vol": annualized_vol(returns, periods),
+            "sharpe": sharpe(returns, risk_free, periods),
+            "sortino": sortino(returns, risk_free, periods),
+            "max_drawdown": max_drawdown,
+            "drawdown_months": drawdown_months,
+            "hit_rate": hit_rate(returns),
+        }
+        if bench_returns is not None:
+            beta, alpha, tracking_error, information_ratio = relative(returns, bench_returns, periods)
+            table.update(beta=beta, alpha=alpha, tracking_error=tracking_error, information_ratio=information_ratio)
+
+    summary_df = pd.DataFrame(table)
+    if strategies is not None:
+        summary_df = pd.concat([strategies.reset_index(drop=True), summary_df], axis=1)
+    return summary_df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Risk and return metrics for every strategy in a results file")
+    parser.add_argument("results")
+    parser.add_argument("--sort", default="sharpe", help="metric to rank strategies by")
+    parser.add_argument("--top", type=int, default=None, help="show only the best N strategies")
+    parser.add_argument("--risk-free", type=float, default=0.0, help="annual risk-free rate")
+    parser.add_argument("--spy", default=benchmark.SOURCE, help="benchmark daily closes CSV")
+    parser.add_argument("--output", default=None, help="save the summary table as CSV")
+    args = parser.parse_args()
+
+    months, strategies, matrix = return_matrix(args.results)
+    bench_returns = benchmark.load(args.spy).month_returns(months)
+    summary_df = summary(matrix, months, bench_returns, strategies, args.risk_free)
+    summary_df = summary_df.sort_values(args.sort, ascending=False, kind="stable", ignore_index=True)
+    if args.output:
+        summary_df.to_csv(args.output, index=False)
+        print(f"✅ Saved to {args.output}")
+    print((summary_df if args.top is None else summary_df.head(args.top)).to_string(index=False, float_format=lambda x: f"{x:.4f}"))
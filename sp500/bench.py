@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import engine
+import holdings
+import membership
+import price_store
+import report
+import results
+
+# Benchmark suite for the momentum pipeline on synthetic data.
+#
+# Each case builds a fixed-seed synthetic index (a constituent CSV with a row
+# per business day, like sp500_cleaned.csv, plus a price store in a temp
+# directory), then times every phase of a backtest and records its peak
+# traced memory:
+#   membership parsing, ticker validation, price loading, return
+#   computation, ranking, portfolio aggregation, reporting
+# Ranking is 12-1 momentum (twelve months' window skipping the latest), so
+# it covers the prefix-sum signal and the universe mask, not just the pick.
+# Reporting is what a run ends with: results.save of the CSV export and
+# report.py's chart of it.
+# Throughput is formation-months per second over price loading through
+# reporting, i.e. what a backtest costs once the store is filled.
+#
+#   python bench.py                 # 500 x 20y monthly and 3000 x 30y daily
+#   python bench.py --quick         # small sizes for a smoke run
+#   python bench.py --json out.json # save results to compare across commits
+CASES = {
+    "sp500_monthly": dict(names=500, years=20, interval="1mo"),
+    "stress_daily": dict(names=3000, years=30, interval="1d"),
+}
+QUICK_CASES = {
+    "sp500_monthly": dict(names=100, years=5, interval="1mo"),
+    "stress_daily": dict(names=300, years=5, interval="1d"),
+}
+
+
+def synthetic_membership(names, years, seed=0, turnover=1.5):
+    """Month-end snapshots of an index of `names` members drawn from a ~2x pool."""
+    rng = np.random.default_rng(seed)
+    months = np.arange(np.datetime64("2000-01"), np.datetime64("2000-01") + years * 12)
+    pool = np.array([f"S{i:05d}" for i in range(names * 2)])
+
+    bitmap = np.zeros((len(months), len(pool)), dtype=bool)
+    current = np.zeros(len(pool), dtype=bool)
+    current[:names] = True
+    for i in range(len(months)):
+        # Swap a handful of members for outsiders each month
+        swaps = min(rng.poisson(turnover), names)
+        leaving = rng.choice(np.flatnonzero(current), swaps, replace=False)
+        joining = rng.choice(np.flatnonzero(~current), swaps, replace=False)
+        current[leaving] = False
+        current[joining] = True
+        bitmap[i] = current
+    dates = (months + 1).astype("datetime64[D]") - 1
+    return pool, dates, bitmap
+
+
+def write_membership_csv(path, pool, dates, bitmap, daily=False):
+    """One row per snapshot, or with `daily` one per business day up to and including each snapshot date."""
+    tickers = [",".join(pool[row]) for row in bitmap]
+    if daily:
+        days = [pd.bdate_range(pd.Timestamp(start) + pd.Timedelta(days=1), end).union([pd.Timestamp(end)])
+                for start, end in zip(np.concatenate([[dates[0] - 1], dates[:-1]]), dates)]
+        tickers = np.repeat(tickers, [len(span) for span in days])
+        dates = np.concatenate([span.values for span in days])
+    pd.DataFrame({
+        "date": pd.DatetimeIndex(dates).strftime('%Y-%m-%d'),
+        "tickers": tickers,
+    }).to_csv(path, index=False)
+
+
+def fill_store(store_dir, pool, dates, interval, seed=0):
+    """Random-walk OHLCV bars for every pool ticker over the membership span."""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp(dates[0]) - pd.DateOffset(months=1)
+    end = pd.Timestamp(dates[-1]) + pd.DateOffset(months=3)
+    if interval == "1d":
+        bar_dates = pd.bdate_range(start, end)
+        drift, vol = 0.0004, 0.02
+    else:
+        bar_dates = pd.date_range(start, end, freq="MS")
+        drift, vol = 0.008, 0.08
+
+    for ticker in pool:
+        close = 50 * np.exp(np.cumsum(rng.normal(drift, vol, len(bar_dates))))
+        frame = pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1e6},
+                             index=bar_dates)
+        price_store.write_ticker(ticker, frame, interval, store_dir)
+    price_store.build_availability(interval, store_dir)
+
+
+class PhaseTimer:
+
+    def __init__(self, case):
+        self.case = case
+        self.rows = []
+
+    def __call__(self, phase, fn, *args, **kwargs):
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        out = fn(*args, **kwargs)
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        self.rows.append({"case": self.case, "phase": phase, "seconds": seconds, "peak_mb": peak / 2 ** 20})
+        return out
+
+
+def _validate_all(members, month_ends, interval, store_dir):
+    for month_end in month_ends:
+        window_start = month_end - pd.Timedelta(days=7)
+        window_end = month_end + pd.DateOffset(months=2)
+        price_store.available(members.constituents(month_end), window_start, window_end, interval, store_dir)
+
+
+def run_case(case, names, years, interval, top_n=10, lookback=12, skip=1, lag=2):
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "constituents.csv")
+        store_dir = os.path.join(tmp, "store")
+        pool, dates, bitmap = synthetic_membership(names, years)
+        write_membership_csv(csv_path, pool, dates, bitmap, daily=True)
+        fill_store(store_dir, pool, dates, interval)
+
+        timer = PhaseTimer(case)
+        tracemalloc.start()
+        try:
+            members = timer("membership parsing", membership.compile_membership, csv_path)
+            timer("ticker validation", _validate_all, members, members.month_ends(), interval, store_dir)
+
+            months = engine.month_grid(members, lag, history=engine._history(dict(lookback=lookback, skip=skip)))
+            start = str((months[0] - 1).astype("datetime64[D]"))
+            end = str((months[-1] + 1).astype("datetime64[D]"))
+            provider = price_store.StoreProvider(store_dir)
+            close = timer("price loading", provider.close_panel, members.tickers.tolist(), start, end, interval)
+            returns = timer("return computation", engine.monthly_returns, members, months, close)
+
+            rows = engine.formation_rows(months, engine.formation_months(members, 1, lag))
+            top = timer("ranking", _rank, members, months, returns, rows, top_n, lookback, skip, lag)
+            portfolio_return = timer("portfolio aggregation", engine.portfolio_returns, returns[rows + 1], top)
+            timer("reporting", _save_and_chart, members, months[rows], top, portfolio_return, tmp, lag)
+        finally:
+            tracemalloc.stop()
+
+    backtest_seconds = sum(row["seconds"] for row in timer.rows[2:])
+    summary = {
+        "case": case,
+        "names": names,
+        "years": years,
+        "interval": interval,
+        "formation_months": len(rows),
+        "formation_months_per_sec": len(rows) / backtest_seconds,
+        "peak_mb": max(row["peak_mb"] for row in timer.rows),
+    }
+    return timer.rows, summary
+
+
+def _rank(members, months, returns, rows, top_n, lookback, skip, lag):
+    # What engine.backtest ranks with: the lookback signal off the log-return
+    # prefix sums, the point-in-time universe and the top-N pick
+    signal = engine.formation_signal(returns, lookback, skip)[rows]
+    universe = engine.universe_mask(members, months, rows, lag)
+    return engine.select_top(signal, universe, top_n)
+
+
+def _save_and_chart(members, formation, top, portfolio_return, out_dir, lag):
+    # The engine's results frame, saved and charted the way a backtest run and report.py are
+    keep = np.isfinite(portfolio_return)
+    results_df = pd.DataFrame({
+        "formation_month": pd.DatetimeIndex(formation[keep].astype("datetime64[D]")).strftime('%Y-%m'),
+        **holdings.as_columns(top[keep]),
+        "portfolio_return": portfolio_return[keep],
+    })
+    path = os.path.join(out_dir, "results.csv")
+    results.save(results_df, members.tickers, path, top_n=top.shape[1], stride=1, lag=lag)
+    for chart in report.strategy_charts(path, benchmark=False):
+        report.render(chart, out_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time each phase of the momentum pipeline on synthetic data")
+    parser.add_argument("--quick", action="store_true", help="small universes for a smoke run")
+    parser.add_argument("--case", choices=sorted(CASES), action="append", help="run only these cases")
+    parser.add_argument("--json", default=None, help="write phase timings and summaries to this file")
+    args = parser.parse_args()
+
+    cases = QUICK_CASES if args.quick else CASES
+    all_rows, summaries = [], []
+    for case in args.case or list(cases):
+        print(f"⏱️ {case}: {cases[case]}")
+        rows, summary = run_case(case, **cases[case])
+        all_rows.extend(rows)
+        summaries.append(summary)
+
+    print()
+    print(pd.DataFrame(all_rows).to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    print()
+    print(pd.DataFrame(summaries).to_string(index=False, float_format=lambda x: f"{x:.1f}"))
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"phases": all_rows, "summary": summaries}, fh, indent=2)
+        print(f"\n✅ Saved to {args.json}")
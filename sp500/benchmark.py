@@ -0,0 +1,118 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import journal
+
+# SPY benchmark series, built once and cached.
+#
+# The SPY CSVs in this folder are copies of one daily close series with
+# different headers (SPY_cleaned.csv: Date,Close; SPY_with_daily_returns.csv
+# adds daily_return_pct; SPY_2004_2025.csv is yf.download's two-row header).
+# load() reads any of them and derives
+#   daily   - close, return, cumulative return per trading day
+#   monthly - month-end close, month-over-month return, cumulative return
+# then caches the arrays next to the source in <source>.benchmark.npz, keyed
+# on the source file's hash, so charts and analytics never redo the
+# resample. Returns are fractions; cumulative returns start at 0 on the
+# first close (daily) or the first month end (monthly).
+SOURCE = "SPY_cleaned.csv"
+CACHE_SUFFIX = ".benchmark.npz"
+
+_loaded = {}
+
+
+def cache_path(source=SOURCE):
+    return os.path.splitext(source)[0] + CACHE_SUFFIX
+
+
+def read_closes(source=SOURCE):
+    """(dates, closes) from a benchmark CSV in any of the folder's layouts."""
+    frame = pd.read_csv(source)
+    # The first column holds the dates; extra header rows (Ticker, Date) do not parse
+    dates = pd.to_datetime(frame.iloc[:, 0], errors="coerce", format="%Y-%m-%d")
+    keep = dates.notna().to_numpy()
+    closes = pd.to_numeric(frame["Close"][keep]).to_numpy(dtype=np.float64)
+    dates = dates[keep].to_numpy().astype("datetime64[D]")
+    order = np.argsort(dates, kind="stable")
+    return dates[order], closes[order]
+
+
+def build(dates, closes):
+    """Every daily and monthly series as a dict of arrays."""
+    daily_return = np.full(len(closes), np.nan)
+    daily_return[1:] = closes[1:] / closes[:-1] - 1
+
+    bar_months = dates.astype("datetime64[M]")
+    last_bar = np.flatnonzero(np.append(bar_months[1:] != bar_months[:-1], True))
+    month_close = closes[last_bar]
+    monthly_return = np.full(len(last_bar), np.nan)
+    monthly_return[1:] = month_close[1:] / month_close[:-1] - 1
+    return {
+        "dates": dates,
+        "closes": closes,
+        "daily_return": daily_return,
+        "daily_cumulative": closes / closes[0] - 1,
+        "months": bar_months[last_bar],
+        "month_close": month_close,
+        "monthly_return": monthly_return,
+        "monthly_cumulative": month_close / month_close[0] - 1,
+    }
+
+
+class Benchmark:
+
+    def __init__(self, series, digest=""):
+        self.series = series
+        self.digest = digest
+        for name, values in series.items():
+            setattr(self, name, values)
+
+    def daily(self):
+        """close, return and cumulative frame indexed by trading day."""
+        return pd.DataFrame({
+            "close": self.closes,
+            "return": self.daily_return,
+            "cumulative": self.daily_cumulative,
+        }, index=pd.DatetimeIndex(self.dates, name="Date"))
+
+    def monthly(self):
+        """close, return and cumulative frame indexed by month-end date."""
+        return pd.DataFrame({
+            "close": self.month_close,
+            "return": self.monthly_return,
+            "cumulative": self.monthly_cumulative,
+        }, index=pd.DatetimeIndex((self.months + 1).astype("datetime64[D]") - 1, name="Date"))
+
+    def month_returns(self, months):
+        """Returns for a datetime64[M] month axis (e.g. the engine's grid), NaN outside the data."""
+        months = np.asarray(months, dtype="datetime64[M]")
+        rows = np.searchsorted(self.months, months)
+        found = (rows < len(self.months)) & (self.months[np.minimum(rows, len(self.months) - 1)] == months)
+        return np.where(found, self.monthly_return[np.minimum(rows, len(self.months) - 1)], np.nan)
+
+    def save(self, path):
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, digest=self.digest, **self.series)
+        os.replace(tmp_path, path)
+
+
+def load(source=SOURCE):
+    """The benchmark for a source CSV, from memory, the hash-keyed cache, or built fresh."""
+    digest = journal.file_digest(source)
+    cached = _loaded.get(source)
+    if cached is not None and cached.digest == digest:
+        return cached
+
+    path = cache_path(source)
+    benchmark = None
+    if os.path.exists(path):
+        with np.load(path) as data:
+            if str(data["digest"]) == digest:
+                benchmark = Benchmark({name: data[name] for name in data.files if name != "digest"}, digest)
+    if benchmark is None:
+        benchmark = Benchmark(build(*read_closes(source)), digest)
+        benchmark.save(path)
+    _loaded[source] = benchmark
+    return benchmark
@@ -0,0 +1,200 @@
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import analytics
+import benchmark
+import results
+
+# Bootstrap confidence intervals for strategy-minus-benchmark returns.
+#
+# Months are resampled in blocks to keep their autocorrelation, either the
+# stationary bootstrap (geometric block lengths with mean `block`) or the
+# circular moving block bootstrap (fixed length `block`). A whole chunk of
+# resamples is drawn as one (resamples x months) index array. Means and
+# variances do not depend on the order of the months, so each resample is
+# reduced to how often it drew every month, and the statistics of all
+# strategies for all resamples of a chunk are matrix products of those
+# counts with the return matrix. Chunk i is drawn from its own seed (spawn
+# key i of `seed`), so results are reproducible for a given seed whatever
+# the number of processes, and the chunks of resamples are spread across
+# processes. Each process keeps the chunks it has drawn for the next block
+# of strategies.
+#
+#   python bootstrap.py mom10_comb.csv --resamples 100000
+#   python bootstrap.py sweep.arrow --top-n 10 --workers 0
+METHODS = ("stationary", "block")
+# Resamples drawn and reduced per matrix product
+CHUNK = 2000
+# Resampled statistics held per strategy block (resamples x strategies)
+BLOCK_VALUES = 4_000_000
+
+
+def resample_indices(rng, n_resamples, n_months, block=6, method="stationary"):
+    """(n_resamples x n_months) month indices, drawn in wrapped blocks."""
+    steps = np.arange(n_months)
+    if method == "block":
+        starts = rng.integers(0, n_months, (n_resamples, -(-n_months // block)))
+        return (starts[:, steps // block] + steps % block) % n_months
+
+    # Stationary: every month starts a new block with probability 1 / block
+    new_block = rng.random((n_resamples, n_months)) < 1 / block
+    new_block[:, 0] = True
+    starts = rng.integers(0, n_months, (n_resamples, n_months))
+    block_start = np.maximum.accumulate(np.where(new_block, steps, 0), axis=1)
+    return (np.take_along_axis(starts, block_start, axis=1) + steps - block_start) % n_months
+
+
+def month_counts(indices, n_months):
+    """How many times each resample drew each month."""
+    offsets = np.arange(len(indices))[:, None] * n_months
+    counts = np.bincount((indices + offsets).ravel(), minlength=len(indices) * n_months)
+    return counts.reshape(len(indices), n_months).astype(np.uint16)
+
+
+def chunk_counts(index, n_resamples, n_months, block=6, method="stationary", seed=0, chunk=CHUNK):
+    """Month counts of the resamples in chunk `index`, drawn from that chunk's own seed."""
+    size = min(chunk, n_resamples - index * chunk)
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+    return month_counts(resample_indices(rng, size, n_months, block, method), n_months)
+
+
+def draw_counts(n_resamples, n_months, block=6, method="stationary", seed=0, chunk=CHUNK):
+    """Month counts of every resample, drawn chunk by chunk from independent seeds."""
+    return np.concatenate([chunk_counts(index, n_resamples, n_months, block, method, seed, chunk)
+                           for index in range(-(-n_resamples // chunk))])
+
+
+def percentiles(samples, q):
+    """Linear-interpolated percentiles `q` of each row of `samples`, ignoring NaN."""
+    # One contiguous sort per row beats np.nanpercentile down the long axis
+    ordered = np.sort(samples, axis=1)
+    n = np.isfinite(ordered).sum(axis=1, keepdims=True)
+    position = np.asarray(q, dtype=np.float64) / 100 * np.maximum(n - 1, 0)
+    below = np.floor(position).astype(np.intp)
+    above = np.minimum(below + 1, np.maximum(n - 1, 0))
+    weight = position - below
+    low = np.take_along_axis(ordered, below, axis=1)
+    high = np.take_along_axis(ordered, above, axis=1)
+    return np.where(n > 0, low + (high - low) * weight, np.nan).T
+
+
+def _moments(counts, values):
+    # Mean and sample variance of every column for every resample
+    valid = np.isfinite(values)
+    filled = np.where(valid, values, 0.0)
+    # Without gaps every column saw every drawn month
+    n = counts @ valid if not valid.all() else counts.sum(axis=1, keepdims=True)
+    mean = (counts @ filled) / n
+    variance = (counts @ filled ** 2 - n * mean ** 2) / (n - 1)
+    return mean, variance
+
+
+_data = None
+_counts = {}
+
+
+def _set_data(returns, excess, draw):
+    # Pool initializer: every worker gets the return matrices once, not per task
+    global _data
+    _data = (returns, excess, draw)
+    _counts.clear()
+
+
+def _chunk_stats(index, start, stop, periods):
+    # Resampled mean excess return and Sharpe of strategy columns start:stop over one chunk of resamples
+    returns, excess, draw = _data
+    if index not in _counts:
+        _counts[index] = chunk_counts(index, *draw)
+    counts = _counts[index].astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_excess = _moments(counts, excess[:, start:stop])[0]
+        mean, variance = _moments(counts, returns[:, start:stop])
+        return mean_excess, mean / np.sqrt(variance) * np.sqrt(periods)
+
+
+def bootstrap(returns, bench_returns, n_resamples=10000, block=6, method="stationary", confidence=0.95,
+              seed=0, workers=1, periods=analytics.PERIODS):
+    """Bootstrap CIs of mean monthly excess return and annualized Sharpe for every strategy column.
+
+    Months without a benchmark return are dropped first. Every strategy is
+    evaluated on the same resamples. Returns one row per strategy with
+    point estimates, lower/upper bounds and the share of resamples whose
+    mean excess return is not positive.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown bootstrap method: {method}")
+    keep = np.isfinite(bench_returns)
+    returns = returns[keep]
+    excess = returns - bench_returns[keep][:, None]
+    tails = [(1 - confidence) / 2 * 100, (1 + confidence) / 2 * 100]
+
+    # Column blocks bound the resampled statistics held at once to BLOCK_VALUES per array
+    n_strategies = returns.shape[1]
+    width = max(1, min(BLOCK_VALUES // n_resamples, n_strategies))
+    chunks = range(-(-n_resamples // CHUNK))
+    draw = (n_resamples, len(returns), block, method, seed, CHUNK)
+    serial = workers == 1 or len(chunks) == 1
+    if serial:
+        _set_data(returns, excess, draw)
+    pool = contextlib.nullcontext() if serial else ProcessPoolExecutor(
+        max_workers=workers or None, initializer=_set_data, initargs=(returns, excess, draw))
+    parts = []
+    with pool:
+        for start in range(0, n_strategies, width):
+            stop = min(start + width, n_strategies)
+            # Every chunk of resamples is one task
+            stats = list((map if serial else pool.map)(_chunk_stats, chunks, [start] * len(chunks),
+                                                       [stop] * len(chunks), [periods] * len(chunks)))
+            # Strategies x resamples, so each strategy's draws are contiguous
+            mean_excess = np.concatenate([values for values, _ in stats]).T.copy()
+            sharpe = np.concatenate([values for _, values in stats]).T.copy()
+            with np.errstate(invalid="ignore"):
+                parts.append((percentiles(mean_excess, tails), percentiles(sharpe, tails),
+                              np.mean(mean_excess <= 0, axis=1)))
+    _counts.clear()
+    (mean_excess_low, mean_excess_high), (sharpe_low, sharpe_high), share = (
+        np.concatenate(values, axis=-1) for values in zip(*parts))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        point_sharpe = analytics.sharpe(returns, periods=periods)
+    return pd.DataFrame({
+        "mean_excess": np.nanmean(excess, axis=0),
+        "mean_excess_low": mean_excess_low,
+        "mean_excess_high": mean_excess_high,
+        "share_not_positive": share,
+        "sharpe": point_sharpe,
+        "sharpe_low": sharpe_low,
+        "sharpe_high": sharpe_high,
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bootstrap CIs of strategy-minus-SPY returns")
+    parser.add_argument("results")
+    parser.add_argument("--resamples", type=int, default=10000)
+    parser.add_argument("--block", type=int, default=6, help="mean (stationary) or fixed (block) block length in months")
+    parser.add_argument("--method", choices=METHODS, default="stationary")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1, help="processes to spread chunks of resamples over (0 = all cores)")
+    parser.add_argument("--spy", default=benchmark.SOURCE, help="benchmark daily closes CSV")
+    parser.add_argument("--output", default=None, help="save the table as CSV")
+    for name in results.PARAMS:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, nargs="+", default=None,
+                            help=f"only strategies with these {name} values")
+    args = parser.parse_args()
+
+    where = {name: getattr(args, name) for name in results.PARAMS if getattr(args, name) is not None}
+    months, strategies, matrix = analytics.return_matrix(args.results, **where)
+    bench_returns = benchmark.load(args.spy).month_returns(months)
+    table = bootstrap(matrix, bench_returns, args.resamples, args.block, args.method, args.confidence,
+                      args.seed, args.workers)
+    table = pd.concat([strategies, table], axis=1)
+    if args.output:
+        table.to_csv(args.output, index=False)
+        print(f"✅ Saved to {args.output}")
+    print(table.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
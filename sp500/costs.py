@@ -0,0 +1,160 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import analytics
+import holdings
+import results
+
+# Turnover and transaction costs from holdings diffs.
+#
+# Every rebalance moves an equal-weighted portfolio from the previous
+# holdings of its strategy to the new ones. Names in both keep their slot
+# (trading only the weight change when N differs), new names are bought
+# and dropped names sold. With the int-coded holdings that is one
+# broadcast equality of each row's ids against the previous row's, for
+# every row of every strategy in a sweep at once. Traded weight is charged
+#   bps    - a flat commission/impact rate per unit traded
+#   spread - half the quoted bid-ask spread per unit traded, one value for
+#            every name or per ticker from a ticker,spread_bps CSV
+# and net returns are the gross holding-month return after paying the
+# rebalance cost up front. The first rebalance of a strategy buys from cash.
+# With holding=K overlapping cohorts, a new cohort replaces the one formed K
+# months earlier, trading that cohort's share of the live cohorts.
+#
+#   python costs.py mom10_comb.csv --bps 10 --spread 5
+#   python costs.py sweep.arrow --spreads spreads.csv --output net.csv
+STRATEGY_KEYS = ["top_n", "stride", "lookback", "skip"]
+BPS = 10.0
+
+
+def _strategy_order(results_df):
+    # (strategy code of each row, rows in strategy then month order, each row's place in that order)
+    keys = [key for key in STRATEGY_KEYS if key in results_df.columns]
+    codes = results_df.groupby(keys, sort=False).ngroup().to_numpy() if keys else np.zeros(len(results_df), dtype=np.intp)
+    # Combined shard files are not always in date order
+    order = np.lexsort((results_df["formation_month"].to_numpy(dtype=str), codes))
+    position = np.empty(len(order), dtype=np.intp)
+    position[order] = np.arange(len(order))
+    return codes, order, position
+
+
+def previous_rows(results_df, holding=1):
+    """Row of each row's previous rebalance in the same strategy (`holding` rows back), -1 for the first."""
+    codes, order, position = _strategy_order(results_df)
+    holding = np.broadcast_to(np.asarray(holding, dtype=np.intp), len(results_df))
+    back = position - holding
+    same = (back >= 0) & (codes[order[np.maximum(back, 0)]] == codes)
+    return np.where(same, order[np.maximum(back, 0)], -1)
+
+
+def live_cohorts(results_df, ids, holding=1):
+    """Cohorts formed in each row's last `holding` rows of its strategy, at least 1."""
+    codes, order, position = _strategy_order(results_df)
+    formed = np.zeros(len(order) + 1, dtype=np.intp)
+    np.cumsum((ids >= 0).any(axis=1)[order], out=formed[1:])
+    # Windows stop at the strategy's first row
+    first = np.searchsorted(codes[order], codes[order], "left")[position]
+    holding = np.broadcast_to(np.asarray(holding, dtype=np.intp), len(results_df))
+    start = np.maximum(position + 1 - holding, first)
+    return np.maximum(formed[position + 1] - formed[start], 1)
+
+
+def traded_weights(ids, previous):
+    """(bought weight per slot of `ids`, sold weight per slot of `previous`) moving between equal-weighted rows."""
+    held, was_held = ids >= 0, previous >= 0
+    weight = 1 / np.maximum(held.sum(axis=1, keepdims=True), 1)
+    was_weight = 1 / np.maximum(was_held.sum(axis=1, keepdims=True), 1)
+    same = (ids[:, :, None] == previous[:, None, :]) & held[:, :, None]
+    kept, still_held = same.any(axis=2), same.any(axis=1)
+
+    bought = np.where(held, np.where(kept, np.maximum(weight - was_weight, 0), weight), 0.0)
+    sold = np.where(was_held, np.where(still_held, np.maximum(was_weight - weight, 0), was_weight), 0.0)
+    return bought, sold
+
+
+def cost_rates(tickers, bps=BPS, spread=0.0, spreads=None):
+    """Cost per unit traded of every ticker id, as a fraction: bps plus half the spread."""
+    spread_bps = np.full(len(tickers), float(spread))
+    if spreads:
+        lookup = {ticker: i for i, ticker in enumerate(np.asarray(tickers).tolist())}
+        known = [(lookup[ticker], value) for ticker, value in spreads.items() if ticker in lookup]
+        if known:
+            rows, values = zip(*known)
+            spread_bps[list(rows)] = values
+    return (bps + spread_bps / 2) / 1e4
+
+
+def apply(results_df, tickers, bps=BPS, spread=0.0, spreads=None, holding=1):
+    """Results frame with turnover, cost and net_return next to the gross portfolio_return.
+
+    turnover is the fraction of the portfolio bought at the rebalance (1 is
+    a full replacement), cost the fraction of capital paid to trade, both
+    for the whole portfolio. `holding` is one value or one per row.
+    """
+    ids = holdings.Holdings.from_frame(results_df, tickers).ids
+    previous_row = previous_rows(results_df, holding)
+    previous = np.where((previous_row >= 0)[:, None], ids[np.maximum(previous_row, 0)], -1)
+
+    bought, sold = traded_weights(ids, previous)
+    rates = np.append(cost_rates(tickers, bps, spread, spreads), 0.0)
+    share = 1 / live_cohorts(results_df, ids, holding)
+    cost = ((bought * rates[ids]).sum(axis=1) + (sold * rates[previous]).sum(axis=1)) * share
+
+    net_df = results_df.drop(columns=holdings.columns_of(results_df))
+    net_df["turnover"] = bought.sum(axis=1) * share
+    net_df["cost"] = cost
+    net_df["net_return"] = (1 + net_df["portfolio_return"].to_numpy()) * (1 - cost) - 1
+    return net_df
+
+
+def summary(net_df, periods=analytics.PERIODS):
+    """Per-strategy mean turnover, annual cost drag and annualized gross and net returns."""
+    keys = [key for key in STRATEGY_KEYS if key in net_df.columns]
+    frame = net_df.assign(
+        log_gross=np.log1p(net_df["portfolio_return"]),
+        log_net=np.log1p(net_df["net_return"]),
+        months=1,
+    )
+    grouped = frame.groupby(keys, sort=True) if keys else frame.groupby(np.zeros(len(frame), dtype=int))
+    totals = grouped.agg(turnover=("turnover", "mean"), cost=("cost", "mean"), log_gross=("log_gross", "sum"),
+                         log_net=("log_net", "sum"), months=("months", "sum"))
+    return pd.DataFrame({
+        "months": totals["months"],
+        "mean_turnover": totals["turnover"],
+        "annual_cost": totals["cost"] * periods,
+        "gross_ann_return": np.expm1(totals["log_gross"] * periods / totals["months"]),
+        "net_ann_return": np.expm1(totals["log_net"] * periods / totals["months"]),
+    }).reset_index(drop=not keys)
+
+
+def read_spreads(path):
+    """{ticker: spread in bps} from a ticker,spread_bps CSV."""
+    frame = pd.read_csv(path)
+    return dict(zip(frame["ticker"], frame["spread_bps"].astype(float)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Turnover, trading costs and net returns of results files")
+    parser.add_argument("results")
+    parser.add_argument("--bps", type=float, default=BPS, help="cost per unit traded, in basis points")
+    parser.add_argument("--spread", type=float, default=0.0, help="quoted bid-ask spread of every name, in basis points")
+    parser.add_argument("--spreads", default=None, help="ticker,spread_bps CSV overriding --spread per name")
+    parser.add_argument("--holding", type=int, default=None, help="months each cohort is held (default: from the file, else 1)")
+    parser.add_argument("--output", default=None, help="save per-rebalance gross/net returns as CSV")
+    args = parser.parse_args()
+
+    results_df, tickers, kind = results.load(args.results)
+    holding = args.holding
+    if holding is None:
+        if results.is_columnar(args.results):
+            holding = results.read(args.results, ["holding"])["holding"].to_numpy()
+        else:
+            holding = results.saved_params(args.results).get("holding", 1)
+    spreads = read_spreads(args.spreads) if args.spreads else None
+    net_df = apply(results_df, tickers, args.bps, args.spread, spreads, holding)
+    if args.output:
+        net_df.to_csv(args.output, index=False)
+        print(f"✅ Saved to {args.output}")
+    print(summary(net_df).to_string(index=False, float_format=lambda x: f"{x:.4f}"))
@@ -0,0 +1,167 @@
+import os
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import membership
+
+# Delta-encoded constituent history.
+#
+# Consecutive snapshots of an index differ by a handful of names, yet every
+# row of the constituent CSVs repeats all ~500 tickers. A delta history
+# stores
+#   tickers   - the interned ticker dictionary
+#   dates     - snapshot dates
+#   change_*  - the add/remove log: (row, ticker id, +1 add / -1 remove)
+#               sorted by row then id, row being the first snapshot with
+#               the change (the first snapshot is all adds)
+#   keyframes - packed full snapshots every KEYFRAME_EVERY rows
+# in one <name>.delta.npz. The snapshot on any date is a binary search for
+# its row, its nearest keyframe, and the few log entries since; what
+# changed between two dates is the net of the log slice between their rows,
+# without building either snapshot.
+#
+#   python deltas.py convert sp500_cleaned.csv
+#   python deltas.py changes sp500_cleaned.delta.npz 2020-01-01 2021-01-01
+#   python deltas.py show sp500_cleaned.delta.npz 2010-06-30
+SUFFIX = membership.DELTA_SUFFIX
+KEYFRAME_EVERY = 64
+
+
+class DeltaHistory:
+
+    def __init__(self, tickers, dates, change_row, change_id, change_op, keyframes, keyframe_every=KEYFRAME_EVERY):
+        self.tickers = np.asarray(tickers)
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.change_row = np.asarray(change_row, dtype=np.int32)
+        self.change_id = np.asarray(change_id, dtype=np.int32)
+        self.change_op = np.asarray(change_op, dtype=np.int8)
+        self.keyframes = np.asarray(keyframes, dtype=np.uint8)
+        self.keyframe_every = int(keyframe_every)
+
+    def __len__(self):
+        return len(self.dates)
+
+    @classmethod
+    def from_index(cls, index, keyframe_every=KEYFRAME_EVERY):
+        """Encode a membership.MembershipIndex."""
+        padded = np.zeros((len(index) + 1, len(index.tickers)), dtype=np.int8)
+        padded[1:] = index.bitmap
+        # Row-major nonzero() leaves the log sorted by row, then id
+        rows, ids = np.nonzero(np.diff(padded, axis=0))
+        ops = index.bitmap[rows, ids].astype(np.int8) * 2 - 1
+        keyframes = np.packbits(index.bitmap[::keyframe_every], axis=1)
+        return cls(index.tickers, index.dates, rows, ids, ops, keyframes, keyframe_every)
+
+    def _row(self, date):
+        # Last snapshot at or before `date`, or -1 before the history starts
+        return int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(date), "D"), "right") - 1)
+
+    def _log(self, first_row, last_row):
+        # Log slice of the changes made by rows first_row..last_row
+        lo, hi = np.searchsorted(self.change_row, [first_row, last_row + 1], "left")
+        return self.change_id[lo:hi], self.change_op[lo:hi]
+
+    def _net(self, first_row, last_row):
+        ids, ops = self._log(first_row, last_row)
+        return np.bincount(ids, weights=ops, minlength=len(self.tickers)).astype(np.int8)
+
+    def mask_on(self, date):
+        """Boolean membership over the ticker dictionary on `date`."""
+        row = self._row(date)
+        if row < 0:
+            return np.zeros(len(self.tickers), dtype=bool)
+        frame = row // self.keyframe_every
+        state = np.unpackbits(self.keyframes[frame], count=len(self.tickers)).astype(np.int8)
+        return (state + self._net(frame * self.keyframe_every + 1, row)) > 0
+
+    def ids_on(self, date):
+        """Integer ticker ids in the index on `date`."""
+        return np.flatnonzero(self.mask_on(date)).astype(np.int32)
+
+    def constituents(self, date):
+        return self.tickers[self.ids_on(date)].tolist()
+
+    def change_ids(self, start, end):
+        """(added ids, removed ids) from the snapshot in force on `start` to the one on `end`."""
+        first, last = self._row(start), self._row(end)
+        # Going back in time undoes the log slice in between
+        sign = 1 if first <= last else -1
+        net = self._net(min(first, last) + 1, max(first, last)) * sign
+        return np.flatnonzero(net > 0).astype(np.int32), np.flatnonzero(net < 0).astype(np.int32)
+
+    def changes_between(self, start, end):
+        """(added tickers, removed tickers) between two dates, in ticker order."""
+        added, removed = self.change_ids(start, end)
+        return sorted(self.tickers[added].tolist()), sorted(self.tickers[removed].tolist())
+
+    def to_index(self):
+        """Expand back to a membership.MembershipIndex."""
+        steps = np.zeros((len(self.dates), len(self.tickers)), dtype=np.int8)
+        steps[self.change_row, self.change_id] = self.change_op
+        return membership.MembershipIndex(self.tickers, self.dates, np.cumsum(steps, axis=0, dtype=np.int8) > 0)
+
+    def save(self, path):
+        tmp_path = path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            tickers=self.tickers,
+            dates=self.dates,
+            change_row=self.change_row,
+            change_id=self.change_id,
+            change_op=self.change_op,
+            keyframes=self.keyframes,
+            keyframe_every=self.keyframe_every,
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["tickers"], data["dates"], data["change_row"], data["change_id"], data["change_op"],
+                       data["keyframes"], data["keyframe_every"])
+
+
+def delta_path(csv_path):
+    return os.path.splitext(csv_path)[0] + SUFFIX
+
+
+def convert(csv_path, path=None, keyframe_every=KEYFRAME_EVERY):
+    """Write the delta history of every snapshot date in a constituent CSV; returns its path."""
+    path = path or delta_path(csv_path)
+    DeltaHistory.from_index(membership.compile_membership(csv_path), keyframe_every).save(path)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delta-encoded constituent histories")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    convert_cmd = sub.add_parser("convert", help="encode constituent CSVs as <name>.delta.npz")
+    convert_cmd.add_argument("csv", nargs="*", default=["sp500_cleaned.csv"])
+    convert_cmd.add_argument("--keyframe-every", type=int, default=KEYFRAME_EVERY)
+
+    changes_cmd = sub.add_parser("changes", help="names added and removed between two dates")
+    changes_cmd.add_argument("history")
+    changes_cmd.add_argument("start")
+    changes_cmd.add_argument("end")
+
+    show_cmd = sub.add_parser("show", help="constituents on a date")
+    show_cmd.add_argument("history")
+    show_cmd.add_argument("date")
+
+    args = parser.parse_args()
+    if args.command == "convert":
+        for csv_path in args.csv:
+            path = convert(csv_path, keyframe_every=args.keyframe_every)
+            history = DeltaHistory.load(path)
+            print(f"✅ {csv_path} ({os.path.getsize(csv_path) / 1e6:.2f} MB): {len(history)} snapshots, "
+                  f"{len(history.change_row)} changes -> {path} ({os.path.getsize(path) / 1e6:.2f} MB)")
+    elif args.command == "changes":
+        added, removed = DeltaHistory.load(args.history).changes_between(args.start, args.end)
+        print(f"➕ Added ({len(added)}): {','.join(added)}")
+        print(f"➖ Removed ({len(removed)}): {','.join(removed)}")
+    else:
+        tickers = DeltaHistory.load(args.history).constituents(args.date)
+        print(f"{len(tickers)} constituents on {args.date}: {','.join(tickers)}")
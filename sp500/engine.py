@@ -0,0 +1,556 @@
+import os
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+import price_store
+import providers
+import fetcher
+import symbols
+import membership
+import journal
+import benchmark
+import holdings
+import instrument
+import results
+
+# Vectorized momentum backtest.
+#
+# Every formation month is evaluated at once on a months x tickers return
+# matrix: mask the matrix by index membership, rank each row, then gather the
+# next month's returns of the top-N names. The month axis is aligned so that
+# the stage scripts' conventions hold:
+#   - constituents are taken at the end of month i of the membership file
+#   - formation month is i + lag (lag=2 matches the original download window)
+#   - the portfolio is held for the month after formation, or with
+#     holding=K for K months as overlapping cohorts (Jegadeesh-Titman)
+#   - formation months step by `stride` (1, 6 or 12 in the old scripts)
+#   - the signal is the compounded return over `lookback` months ending
+#     `skip` months before formation (lookback=1, skip=0 is the scripts'
+#     single formation-month return; lookback=11, skip=1 is 12-1 momentum)
+# The grid can start `history` months before the first snapshot so that
+# multi-month lookbacks have data behind the first formation month.
+
+
+def month_grid(members, lag=2, history=0):
+    """Monthly axis from `history` months before the first snapshot to the last holding month."""
+    first = members.dates[0].astype("datetime64[M]")
+    last = members.dates[-1].astype("datetime64[M]")
+    return np.arange(first - history, last + lag + 1)
+
+
+def load_returns(members, months, provider=None, interval="1mo"):
+    """months x tickers simple monthly returns for every ticker in the index.
+
+    Prices come from `provider` (any providers.PriceProvider), by default the
+    local price store; network sources are fetched through the rate limiter
+    and the symbol registry. Missing prices are NaN; the month before
+    months[0] is loaded as well so the first row has a return.
+    """
+    start = str((months[0] - 1).astype("datetime64[D]"))
+    end = str((months[-1] + 1).astype("datetime64[D]"))
+    provider = provider or price_store.StoreProvider()
+    if provider.network:
+        provider = fetcher.Fetcher(provider, registry=symbols.load())
+    with instrument.phase("prices"):
+        close = provider.close_panel(members.tickers.tolist(), start, end, interval)
+    with instrument.phase("returns"):
+        return monthly_returns(members, months, close)
+
+
+def monthly_returns(members, months, close):
+    """Month-over-month returns on the grid from a dates x tickers close frame.
+
+    Any bar frequency works: the last bar of each month is its month-end
+    close (this also drops the partial mid-month bar Yahoo can emit).
+    """
+    prices = np.full((len(months) + 1, len(members.tickers)), np.nan)
+    if not close.empty:
+        bar_months = close.index.values.astype("datetime64[M]")
+        close = close.groupby(bar_months).last()
+        # Row 0 holds the month before the grid, row k + 1 holds months[k]
+        rows = (close.index.values.astype("datetime64[M]") - (months[0] - 1)).astype(np.intp)
+        inside = (rows >= 0) & (rows <= len(months))
+        cols = np.array([members.ticker_ids[ticker] for ticker in close.columns], dtype=np.intp)
+        prices[np.ix_(rows[inside], cols)] = close.to_numpy()[inside]
+
+    return prices[1:] / prices[:-1] - 1
+
+
+def log_prefix(returns):
+    """Prefix sums of log growth and of missing returns down the month axis.
+
+    Both have one more row than `returns`: row t sums returns[:t], so the
+    window of rows [a, b) is prefix[b] - prefix[a] for every ticker at once.
+    """
+    # A total loss would be -inf and poison every later window of the sum
+    logs = np.log1p(np.maximum(returns, -1 + 1e-12))
+    missing = np.isnan(logs)
+    total = np.zeros((len(returns) + 1, returns.shape[1]))
+    np.cumsum(np.where(missing, 0.0, logs), axis=0, out=total[1:])
+    gaps = np.zeros(total.shape, dtype=np.int32)
+    np.cumsum(missing, axis=0, out=gaps[1:])
+    return total, gaps
+
+
+def window_signal(prefix, lookback=1, skip=0):
+    """Compounded return over the `lookback` months ending `skip` months before each row.
+
+    O(1) per cell from a log_prefix(); NaN where the window runs off the
+    grid or has a missing month.
+    """
+    total, gaps = prefix
+    end = np.arange(len(total) - 1) - skip + 1
+    start = end - lookback
+    valid = start >= 0
+    start, end = start[valid], end[valid]
+
+    signal = np.full((len(total) - 1, total.shape[1]), np.nan)
+    complete = gaps[end] == gaps[start]
+    signal[valid] = np.where(complete, np.expm1(total[end] - total[start]), np.nan)
+    return signal
+
+
+def formation_signal(returns, lookback=1, skip=0):
+    """Compounded (lookback, skip) return for every month and ticker of the matrix."""
+    return window_signal(log_prefix(returns), lookback, skip)
+
+
+def select_top(signal, universe, top_n):
+    """Row-wise top-N ticker ids by signal among `universe`, padded with -1."""
+    scores = np.where(universe & np.isfinite(signal), signal, -np.inf)
+    top = np.argsort(-scores, axis=1, kind="stable")[:, :top_n]
+    picked = np.take_along_axis(scores, top, axis=1) > -np.inf
+    return np.where(picked, top, -1).astype(np.int32)
+
+
+def portfolio_returns(returns, holdings):
+    """Equal-weighted mean return of each row's holdings (ignoring -1 and NaN)."""
+    gathered = np.take_along_axis(returns, np.clip(holdings, 0, None), axis=-1)
+    gathered = np.where(holdings >= 0, gathered, np.nan)
+    held = np.isfinite(gathered).sum(axis=-1)
+    total = np.nansum(gathered, axis=-1)
+    return np.where(held > 0, total / np.maximum(held, 1), np.nan)
+
+
+def cohort_returns(returns, rows, cohorts, holding=1):
+    """Return in the month after each row of the cohorts formed in its last `holding` months.
+
+    `cohorts` holds the ids picked at every grid row (-1 where no cohort was
+    formed). The live cohorts of all rows are gathered in one pass; each
+    cohort is equal-weighted internally and the live cohorts equally
+    against each other.
+    """
+    lags = rows[:, None] - np.arange(holding)
+    live = np.where((lags >= 0)[..., None], cohorts[np.maximum(lags, 0)], -1)
+    per_cohort = portfolio_returns(returns[rows + 1][:, None, :], live)
+    held = np.isfinite(per_cohort).sum(axis=1)
+    return np.where(held > 0, np.nansum(per_cohort, axis=1) / np.maximum(held, 1), np.nan)
+
+
+def formation_months(members, stride=1, lag=2):
+    """Every `stride`-th formation month, anchored on the first membership snapshot."""
+    first = members.dates[0].astype("datetime64[M]")
+    last = members.dates[-1].astype("datetime64[M]")
+    return np.arange(first, last, stride) + lag
+
+
+def formation_rows(months, formation):
+    """Grid rows of the formation months that fit the grid with a holding month after them."""
+    rows = np.searchsorted(months, formation)
+    return rows[(rows + 1 < len(months)) & (months[np.minimum(rows, len(months) - 1)] == formation)]
+
+
+def universe_mask(members, months, rows, lag):
+    """Constituents at the end of the snapshot month `lag` months before each formation row."""
+    snapshot_month_ends = (months[rows] - lag + 1).astype("datetime64[D]") - 1
+    return members.mask(snapshot_month_ends)
+
+
+def _month_labels(months):
+    return pd.DatetimeIndex(months.astype("datetime64[D]")).strftime('%Y-%m')
+
+
+def backtest(members, returns, months, top_n=5, stride=1, lag=2, lookback=1, formation=None, skip=0, holding=1):
+    """Run one configuration on a prepared return matrix.
+
+    `formation` restricts the run to some formation months (by default every
+    `stride`-th month of the membership file). Returns a frame with
+    formation_month, holding_1..holding_<N> and portfolio_return; holdings
+    are int32 ids into members.tickers (see holdings.py), and a CSV export
+    (results.export_csv) gets the top_<N> layout of the stage scripts' files.
+
+    With holding=K > 1 a cohort is formed every `stride` months and held for
+    K months, and there is a row for every month: portfolio_return is the
+    next month's return of the cohorts formed in the last K months and the
+    holdings are the cohort formed that month (all -1 if none).
+    """
+    if formation is None:
+        formation = formation_months(members, stride if holding == 1 else 1, lag)
+    rows = formation_rows(months, formation)
+    instrument.count("formation_months", len(rows))
+
+    # Cohorts formed up to holding - 1 months before the first row are still live in it
+    every = formation_months(members, 1, lag)
+    formed = every[(every > formation[0] - holding) & (every <= formation[-1])]
+    formed = formed[(formed - every[0]).astype(int) % stride == 0]
+    formed_rows = formation_rows(months, formed)
+    with instrument.phase("ranking"):
+        universe = universe_mask(members, months, formed_rows, lag)
+        signal = formation_signal(returns, lookback, skip)[formed_rows]
+        cohorts = np.full((len(months), top_n), -1, dtype=np.int32)
+        cohorts[formed_rows] = select_top(signal, universe, top_n)
+    with instrument.phase("aggregation"):
+        portfolio_return = cohort_returns(returns, rows, cohorts, holding)
+
+    keep = np.isfinite(portfolio_return)
+    return pd.DataFrame({
+        "formation_month": _month_labels(months[rows[keep]]),
+        **holdings.as_columns(cohorts[rows[keep]]),
+        "portfolio_return": portfolio_return[keep],
+    })
+
+
+def sweep(members, returns, months, top_ns=(5, 10), strides=(1, 6, 12), lookbacks=(1,), lag=2, formation=None,
+          skips=(0,)):
+    """Evaluate a whole (top_n, stride, lookback, skip) grid on one return matrix.
+
+    All signals are windows of one log-return prefix sum. Each (lookback,
+    skip) gets one cross-sectional sort of every monthly formation row, deep
+    enough for the largest top-N; every smaller N is a prefix of that
+    ranking and every stride is a subset of its rows, so the grid adds
+    almost nothing over a single configuration. Returns one tidy frame keyed
+    by top_n, stride, lookback and skip, with holdings padded to the largest
+    top-N.
+    """
+    if formation is None:
+        formation = formation_months(members, 1, lag)
+    rows = formation_rows(months, formation)
+    instrument.count("formation_months", len(rows))
+    universe = universe_mask(members, months, rows, lag)
+    # Stride phase is counted from the first formation month of the whole
+    # history, so a shard of it picks the same months as a full run
+    phase = (months[rows] - formation_months(members, 1, lag)[0]).astype(int)
+    depth = max(top_ns)
+    with instrument.phase("ranking"):
+        prefix = log_prefix(returns)
+
+    frames = []
+    for lookback, skip in [(lookback, skip) for lookback in lookbacks for skip in skips]:
+        with instrument.phase("ranking"):
+            ranked = select_top(window_signal(prefix, lookback, skip)[rows], universe, depth)
+        with instrument.phase("aggregation"):
+            gathered = np.take_along_axis(returns[rows + 1], np.clip(ranked, 0, None), axis=1)
+            gathered = np.where(ranked >= 0, gathered, np.nan)
+            # Running sums along the ranking give the mean of every top-N at once
+            total = np.nancumsum(gathered, axis=1)
+            held = np.cumsum(np.isfinite(gathered), axis=1)
+
+            for top_n in top_ns:
+                portfolio_return = np.where(held[:, top_n - 1] > 0, total[:, top_n - 1] / np.maximum(held[:, top_n - 1], 1), np.nan)
+                for stride in strides:
+                    keep = (phase % stride == 0) & (ranked[:, 0] >= 0) & np.isfinite(portfolio_return)
+                    frames.append(pd.DataFrame({
+                        "top_n": top_n,
+                        "stride": stride,
+                        "lookback": lookback,
+                        "skip": skip,
+                        "formation_month": _month_labels(months[rows[keep]]),
+                        **holdings.as_columns(np.where(np.arange(depth) < top_n, ranked[keep], -1)),
+                        "portfolio_return": portfolio_return[keep],
+                    }))
+
+    return _sort_sweep(pd.concat(frames, ignore_index=True))
+
+
+def benchmark_returns(results_df, bench=None):
+    """Benchmark (SPY by default) return over each row's holding month, the month after formation."""
+    bench = bench or benchmark.load()
+    holding_months = np.asarray(results_df["formation_month"], dtype="datetime64[M]") + 1
+    return bench.month_returns(holding_months)
+
+
+def _sort_sweep(results_df):
+    keys = ["top_n", "stride", "lookback", "skip", "formation_month"]
+    return results_df.sort_values(keys, kind="stable", ignore_index=True)
+
+
+def _history(params):
+    # Months of returns needed in front of a formation month
+    lookback = max(params.get("lookbacks", [params.get("lookback", 1)]))
+    skip = max(params.get("skips", [params.get("skip", 0)]))
+    # plus the formation of cohorts still held
+    return lookback + skip - 1 + params.get("holding", 1) - 1
+
+
+def _output_stride(kind, params):
+    # Multi-month holdings report every month, whatever the cohort stride
+    if kind == "backtest" and params.get("holding", 1) == 1:
+        return params.get("stride", 1)
+    return 1
+
+
+def _run_shard(membership_csv, formation, kind, params, lag, provider):
+    # Worker entry point: load just the months this shard needs, including
+    # the lookback history in front of its first formation month
+    members = membership.load_membership(membership_csv)
+    months = np.arange(formation[0] - _history(params), formation[-1] + 2)
+    returns = load_returns(members, months, provider)
+    if kind == "sweep":
+        return sweep(members, returns, months, lag=lag, formation=formation, **params)
+    return backtest(members, returns, months, lag=lag, formation=formation, **params)
+
+
+def _run_shard_instrumented(*args):
+    # Pool workers are separate processes: count from zero and ship the
+    # numbers back with the shard's results
+    instrument.reset()
+    return _run_shard(*args), instrument.snapshot()
+
+
+def run_sharded(membership_csv, kind, params, workers=None, lag=2, provider=None):
+    """Split the formation months into contiguous shards and run them on a process pool.
+
+    `kind` is "backtest" or "sweep" and `params` the keyword arguments for it.
+    Every formation month lands in exactly one shard and each worker loads the
+    lookback it depends on, so the merged result equals a single-process run.
+    """
+    members = membership.load_membership(membership_csv)
+    formation = formation_months(members, _output_stride(kind, params), lag)
+    workers = workers or os.cpu_count() or 1
+    shards = [shard for shard in np.array_split(formation, workers) if len(shard)]
+
+    progress = instrument.Progress(len(formation))
+    with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+        futures = {pool.submit(_run_shard_instrumented, membership_csv, shard, kind, params, lag, provider): i
+                   for i, shard in enumerate(shards)}
+        results = [None] * len(shards)
+        for future in as_completed(futures):
+            results[futures[future]], stats = future.result()
+            instrument.merge(stats)
+            progress.update(len(shards[futures[future]]))
+    progress.close()
+
+    results_df = pd.concat(results, ignore_index=True)
+    return _sort_sweep(results_df) if kind == "sweep" else results_df
+
+
+def run_checkpointed(membership_csv, kind, params, journal_path, resume=False, lag=2,
+                     provider=None, chunk_months=12):
+    """Run formation months in chunks, journaling every finished month.
+
+    With resume=True, months already in the journal from a run with the same
+    parameters, membership file and price store are skipped, so a killed run
+    picks up where it stopped. Returns the full result assembled from the
+    journal.
+    """
+    members = membership.load_membership(membership_csv)
+    formation = formation_months(members, _output_stride(kind, params), lag)
+
+    provider = provider or price_store.StoreProvider()
+    # "holding_ids": rows are journaled with integer-coded holdings, which
+    # only mean the same names under the same ticker dictionary
+    inputs = journal.inputs_hash(kind, params, lag, provider.fingerprint(), "holding_ids", membership.INDEX_VERSION,
+                                 members.tickers.tolist(), files=[membership_csv])
+    log = journal.Journal(journal_path, inputs, resume)
+    todo = np.array([month for month in formation if not log.done(str(month))], dtype=formation.dtype)
+    if resume:
+        print(f"⏩ Resuming: {len(formation) - len(todo)} of {len(formation)} months already done")
+
+    progress = instrument.Progress(len(todo))
+    for start in range(0, len(todo), chunk_months):
+        chunk = todo[start:start + chunk_months]
+        chunk_start = time.perf_counter()
+        chunk_df = _run_shard(membership_csv, chunk, kind, params, lag, provider)
+        with instrument.phase("journal"):
+            for month in chunk:
+                label = str(month)
+                # Months without a portfolio are journaled too, so they are not retried
+                log.record(label, chunk_df[chunk_df["formation_month"] == label].to_dict("records"))
+        # A chunk is computed in one vectorized pass; its months share its time
+        seconds = (time.perf_counter() - chunk_start) / len(chunk)
+        for month in chunk:
+            instrument.record_month(str(month), seconds)
+        progress.update(len(chunk))
+        if not progress.enabled:
+            print(f"💾 Checkpointed through {chunk[-1]}")
+    progress.close()
+
+    results_df = pd.DataFrame([row for label in sorted(log.entries) for row in log.entries[label]])
+    return _sort_sweep(results_df) if kind == "sweep" else results_df
+
+
+def run_backtest(membership_csv, top_n=5, stride=1, output=None, lag=2, provider=None, lookback=1,
+                 workers=1, journal_path=None, resume=False, stats=None, skip=0, holding=1):
+    """Backtest one membership file from the local price store, optionally saving the results.
+
+    `output` ending in .arrow or .feather gets a columnar file (results.py),
+    anything else a CSV export.
+
+    Ends by printing the run's timings and counters as JSON (see
+    instrument.py), also saved to `stats` if given.
+    """
+    instrument.reset()
+    params = dict(top_n=top_n, stride=stride, lookback=lookback, skip=skip, holding=holding)
+    if journal_path:
+        results_df = run_checkpointed(membership_csv, "backtest", params, journal_path, resume, lag, provider)
+    elif workers != 1:
+        results_df = run_sharded(membership_csv, "backtest", params, workers, lag, provider)
+    else:
+        members = membership.load_membership(membership_csv)
+        months = month_grid(members, lag, history=_history(params))
+        returns = load_returns(members, months, provider)
+        results_df = backtest(members, returns, months, top_n, stride, lag, lookback, skip=skip, holding=holding)
+
+    if output:
+        tickers = membership.load_membership(membership_csv).tickers
+        results.save(results_df, tickers, output, "backtest", lag=lag, **params)
+        print(f"\n✅ Done! Saved to {output}")
+    instrument.emit(stats)
+    return results_df
+
+
+def run_sweep(membership_csv, top_ns, strides, lookbacks, output=None, lag=2, provider=None,
+              workers=1, journal_path=None, resume=False, stats=None, skips=(0,)):
+    """Sweep a parameter grid over one membership file in a single pass, reporting stats like run_backtest."""
+    instrument.reset()
+    params = dict(top_ns=top_ns, strides=strides, lookbacks=lookbacks, skips=skips)
+    if journal_path:
+        results_df = run_checkpointed(membership_csv, "sweep", params, journal_path, resume, lag, provider)
+    elif workers != 1:
+        results_df = run_sharded(membership_csv, "sweep", params, workers, lag, provider)
+    else:
+        members = membership.load_membership(membership_csv)
+        months = month_grid(members, lag, history=_history(params))
+        returns = load_returns(members, months, provider)
+        results_df = sweep(members, returns, months, top_ns, strides, lookbacks, lag, skips=skips)
+
+    if output:
+        tickers = membership.load_membership(membership_csv).tickers
+        results.save(results_df, tickers, output, "sweep", lag=lag)
+        print(f"\n✅ Done! Saved to {output}")
+    instrument.emit(stats)
+    return results_df
+
+
+def append_new_months(results_csv, membership_csv, stride=None, lookback=None, lag=None, provider=None, stats=None,
+                      skip=None, holding=None):
+    """Extend an existing results file with the formation months after its last one.
+
+    Works on columnar files and CSV exports, of single configurations and
+    of sweeps, whose grid is read back from the file. Parameters the file
+    records (results.saved_params) are used as saved; a parameter given
+    that disagrees with them, or one the file does not record and that is
+    not given, raises ValueError rather than appending rows of another
+    configuration. Only the new months and the lookback history in front
+    of them are loaded, and the file is replaced atomically.
+    """
+    instrument.reset()
+    members = membership.load_membership(membership_csv)
+    # New rows' ids index members.tickers, a prefix of this dictionary
+    existing, tickers, kind = results.load(results_csv, members.tickers)
+    is_sweep = kind == "sweep"
+    saved = results.saved_params(results_csv)
+    given = dict(stride=stride, lookback=lookback, skip=skip, holding=holding, lag=lag)
+    # A sweep's grid is in its columns
+    for name in ["lag"] if is_sweep else list(given):
+        if given[name] is None and name not in saved:
+            raise ValueError(f"{results_csv} does not record its {name}; pass it explicitly to append")
+        if given[name] is not None and name in saved and given[name] != saved[name]:
+            raise ValueError(f"{results_csv} was run with {name}={saved[name]}, not {given[name]}")
+        given[name] = saved.get(name, given[name])
+    stride, lookback, skip, holding, lag = (given[name] for name in ["stride", "lookback", "skip", "holding", "lag"])
+    if is_sweep and "skip" not in existing.columns:
+        # Sweeps written before skip months existed
+        existing.insert(existing.columns.get_loc("lookback") + 1, "skip", 0)
+
+    last = np.datetime64(existing["formation_month"].max(), "M")
+    params = {} if is_sweep else dict(stride=stride, holding=holding)
+    formation = formation_months(members, _output_stride("sweep" if is_sweep else "backtest", params), lag)
+    formation = formation[formation > last]
+    if not len(formation):
+        print(f"✅ {results_csv} is already up to date")
+        return existing
+
+    lookbacks = sorted(existing["lookback"].unique().tolist()) if is_sweep else [lookback]
+    skips = sorted(existing["skip"].unique().tolist()) if is_sweep else [skip]
+    months = np.arange(formation[0] - _history(dict(params, lookbacks=lookbacks, skips=skips)), formation[-1] + 2)
+    returns = load_returns(members, months, provider)
+
+    if is_sweep:
+        top_ns = sorted(existing["top_n"].unique().tolist())
+        strides = sorted(existing["stride"].unique().tolist())
+        new_df = sweep(members, returns, months, top_ns, strides, lookbacks, lag, formation, skips)
+        results_df = _sort_sweep(pd.concat([existing, new_df], ignore_index=True))
+        results.save(results_df, tickers, results_csv, kind, lag=lag)
+    else:
+        top_n = len(holdings.columns_of(existing))
+        new_df = backtest(members, returns, months, top_n, stride, lag, lookback, formation, skip, holding)
+        results_df = pd.concat([existing, new_df], ignore_index=True)
+        results.save(results_df, tickers, results_csv, kind, top_n=top_n, stride=stride, lookback=lookback,
+                     skip=skip, holding=holding, lag=lag)
+    print(f"✅ Appended {len(new_df)} rows to {results_csv}")
+    instrument.emit(stats)
+    return results_df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vectorized top-N momentum backtest")
+    parser.add_argument("membership", nargs="?", default="sp500_cleaned.csv")
+    parser.add_argument("--top-n", type=int, nargs="+", default=[5])
+    # Unset parameters stay None so --append can tell them from explicit ones
+    parser.add_argument("--stride", type=int, nargs="+", default=None, help="months between formation dates (default 1)")
+    parser.add_argument("--lookback", type=int, nargs="+", default=None, help="formation lookback in months (default 1)")
+    parser.add_argument("--skip", type=int, nargs="+", default=None,
+                        help="months skipped between lookback window and formation (default 0)")
+    parser.add_argument("--holding", type=int, default=None,
+                        help="months each cohort is held, as overlapping cohorts (default 1)")
+    parser.add_argument("--lag", type=int, default=None, help="months from constituent snapshot to formation (default 2)")
+    parser.add_argument("--output", default=None, help="results file: .arrow/.feather columnar, anything else CSV")
+    parser.add_argument("--store", default=price_store.STORE_DIR)
+    parser.add_argument("--source", default=None, help="read prices from a provider (replay:DIR, yahoo, URL) instead of the store")
+    parser.add_argument("--append", action="store_true", help="only add formation months after the last one in --output")
+    parser.add_argument("--journal", default=None, help="checkpoint finished months to this JSONL file")
+    parser.add_argument("--resume", action="store_true", help="skip months already in the journal")
+    parser.add_argument("--workers", type=int, default=1, help="processes to shard the date range over (0 = all cores)")
+    parser.add_argument("--stats", default=None, help="also save the JSON run stats to this file")
+    parser.add_argument("--progress", action="store_true", help="live progress line with months/sec and ETA")
+    parser.add_argument("--trace-memory", action="store_true", help="track peak Python allocations with tracemalloc")
+    args = parser.parse_args()
+    instrument.configure(progress=args.progress, trace_memory=args.trace_memory)
+    provider = providers.from_spec(args.source) if args.source else price_store.StoreProvider(args.store)
+    if args.resume and not args.journal:
+        if not args.output:
+            parser.error("--resume needs --journal or --output")
+        args.journal = args.output + ".journal.jsonl"
+
+    if not args.append:
+        # A fresh run's defaults; --append takes the ones its file recorded
+        args.stride, args.lookback, args.skip = args.stride or [1], args.lookback or [1], args.skip or [0]
+        args.holding = 1 if args.holding is None else args.holding
+        args.lag = 2 if args.lag is None else args.lag
+
+    if args.append:
+        if not args.output:
+            parser.error("--append needs the --output file to extend")
+        first = lambda values: values[0] if values else None
+        try:
+            results_df = append_new_months(args.output, args.membership, first(args.stride), first(args.lookback), args.lag,
+                                           provider, args.stats, first(args.skip), args.holding)
+        except ValueError as e:
+            parser.error(str(e))
+    # More than one value on any axis runs the whole grid as a sweep
+    elif len(args.top_n) * len(args.stride) * len(args.lookback) * len(args.skip) > 1:
+        if args.holding != 1:
+            parser.error("--holding runs one configuration at a time")
+        results_df = run_sweep(args.membership, args.top_n, args.stride, args.lookback, args.output, args.lag, provider,
+                               args.workers, args.journal, args.resume, args.stats, args.skip)
+    else:
+        results_df = run_backtest(args.membership, args.top_n[0], args.stride[0], args.output, args.lag, provider, args.lookback[0],
+                                  args.workers, args.journal, args.resume, args.stats, args.skip[0], args.holding)
+    if not args.output:
+        tickers = membership.load_membership(args.membership).tickers
+        print(holdings.string_view(results_df, tickers).to_string(index=False))
@@ -0,0 +1,166 @@
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+import instrument
+import symbols
+from providers import PartialDownload, RateLimited, from_spec
+
+# Concurrent, rate-limited price fetcher.
+#
+# A Fetcher splits tickers into requests of `provider.batch_size` tickers and
+# runs them on a bounded thread pool. Every request first takes one token per
+# HTTP request it makes (provider.requests) from a shared token bucket, so the
+# pool never exceeds the allowed request rate even when one provider call
+# fetches a hundred tickers, and throttled or failed requests are retried
+# with capped exponential backoff. Network providers own one HTTP session
+# each so connections are reused. With a symbols.SymbolRegistry, known-dead symbols are never
+# requested, aliased ones are requested under the source's spelling, and
+# every outcome is recorded for the next run: a symbol turns invalid only
+# when a request that succeeded came back without it, never when its
+# request was throttled or errored, and only for that request's window, so
+# a name listed later is still requested for the months it traded.
+# engine.load_returns sends every network provider through a Fetcher.
+
+
+class TokenBucket:
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, n=1):
+        """Block until `n` requests may be sent.
+
+        More than the burst waits for a full bucket and leaves it in debt,
+        so the long-run rate holds for large batches too.
+        """
+        needed = min(n, self.capacity)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= needed:
+                    self.tokens -= n
+                    return
+                wait = (needed - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class Fetcher:
+
+    def __init__(self, provider=None, workers=4, rate=2.0, burst=None, max_retries=5, backoff=1.0, max_backoff=60.0,
+                 registry=None):
+        self.provider = provider or from_spec()
+        self.registry = registry
+        self.workers = workers
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def _request(self, tickers, start, end, interval):
+        # ({ticker: frame}, [tickers that still errored after every retry]); the rest came back empty
+        frames = {}
+        for attempt in range(self.max_retries + 1):
+            cost = self.provider.requests(tickers)
+            with instrument.phase("rate_limit_wait"):
+                self.bucket.acquire(cost)
+            instrument.count("requests", cost)
+            try:
+                with instrument.phase("download"):
+                    frames.update(self.provider.download(tickers, start, end, interval))
+                return frames, []
+            except PartialDownload as e:
+                # Keep what came back and retry only the tickers that errored
+                instrument.count("request_errors")
+                frames.update(e.frames)
+                tickers, error = e.failed, e
+            except (RateLimited, OSError) as e:
+                instrument.count("rate_limited" if isinstance(e, RateLimited) else "request_errors")
+                error = e
+            if attempt == self.max_retries:
+                print(f"⚠️ Giving up on {len(tickers)} tickers ({tickers[0]}...) after {attempt + 1} attempts: {error}")
+                return frames, list(tickers)
+            # Full jitter keeps the workers from retrying in lockstep
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+            print(f"⏳ {type(error).__name__} on {tickers[0]}..., retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+    def _request_symbols(self, tickers, start, end, interval):
+        # Request under the registry's spellings; returns ({ticker: frame}, {ticker: spelling that returned
+        # data}, [tickers whose request failed])
+        if self.registry is None:
+            frames, failed = self._request(tickers, start, end, interval)
+            return frames, {}, failed
+        spelled = {self.registry.alias(ticker): ticker for ticker in tickers}
+        frames, failed = self._request(list(spelled), start, end, interval)
+        found = {spelled[spelling]: frame for spelling, frame in frames.items() if spelling in spelled}
+        spellings = {ticker: spelling for spelling, ticker in spelled.items() if ticker in found}
+        failed = [spelled[spelling] for spelling in failed if spelling in spelled]
+
+        # One probe of the other spellings of symbols that cleanly returned no data
+        retry = {candidate: ticker for ticker in tickers
+                 if ticker not in found and ticker not in failed and self.registry.status(ticker) != "valid"
+                 for candidate in symbols.candidates(ticker) if candidate != self.registry.alias(ticker)}
+        if retry:
+            frames, retry_failed = self._request(list(retry), start, end, interval)
+            for spelling, frame in frames.items():
+                if spelling in retry:
+                    found[retry[spelling]] = frame
+                    spellings[retry[spelling]] = spelling
+            failed += [retry[spelling] for spelling in retry_failed if retry[spelling] not in found]
+        return found, spellings, failed
+
+    def fetch_batches(self, tickers, start, end, interval="1mo"):
+        """Yield (batch, {ticker: frame}, [tickers whose request failed]) as each request finishes.
+
+        Symbols known to be dead over the whole window come first as one
+        batch without data. Only tickers that came back empty from a request
+        that succeeded are recorded as missing for start..end; failed ones
+        are left for the next run.
+        """
+        if self.registry is not None:
+            tickers, dead = self.registry.split(tickers, start, end)
+            if dead:
+                instrument.count("symbols_skipped", len(dead))
+                print(f"⏩ Skipping {len(dead)} known-invalid symbols")
+                yield dead, {}, []
+        size = self.provider.batch_size
+        batches = [list(tickers[i:i + size]) for i in range(0, len(tickers), size)]
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = {pool.submit(self._request_symbols, batch, start, end, interval): batch for batch in batches}
+                for future in as_completed(futures):
+                    batch = futures[future]
+                    frames, spellings, failed = future.result()
+                    if self.registry is not None:
+                        self.registry.record(spellings, [ticker for ticker in batch
+                                                         if ticker not in frames and ticker not in failed], start, end)
+                    yield batch, frames, failed
+        finally:
+            if self.registry is not None:
+                self.registry.save()
+
+    def fetch(self, tickers, start, end, interval="1mo"):
+        """Return ({ticker: frame}, [tickers with no data]) for all tickers."""
+        frames, failed = {}, []
+        for _, batch_frames, batch_failed in self.fetch_batches(tickers, start, end, interval):
+            frames.update(batch_frames)
+            failed += batch_failed
+        if failed:
+            print(f"⚠️ {len(failed)} tickers failed to download and are treated as missing")
+        return frames, [ticker for ticker in tickers if ticker not in frames]
+
+    def close_panel(self, tickers, start=None, end=None, interval="1mo", field="Close"):
+        """dates x tickers frame of one field, like PriceProvider.close_panel but rate-limited."""
+        frames, _ = self.fetch(list(tickers), start, end, interval)
+        return pd.DataFrame({ticker: frame[field].astype(np.float64) for ticker, frame in frames.items()})
@@ -0,0 +1,171 @@
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+# Integer-coded portfolio holdings.
+#
+# A result row's holdings are a fixed-width run of int32 ticker ids, padded
+# with -1, into a ticker dictionary (the membership index's interned
+# tickers). Engine frames carry them as holding_1..holding_N columns; the
+# comma-joined strings of the stage scripts' files ("TRB,BLS,CMI,...") are
+# only a view made on export. An exported results file keeps the codes and
+# the dictionary next to it in <results>.holdings.npz, so turnover, overlap
+# and ticker frequencies are array operations instead of string splitting.
+# The sidecar also keeps the run parameters the CSV has no columns for.
+PREFIX = "holding_"
+SUFFIX = ".holdings.npz"
+
+
+def id_columns(width):
+    return [f"{PREFIX}{i + 1}" for i in range(width)]
+
+
+def columns_of(results_df):
+    return [column for column in results_df.columns if column.startswith(PREFIX)]
+
+
+def as_columns(ids):
+    """{holding_k: int32 column} for building a results frame."""
+    ids = np.asarray(ids, dtype=np.int32)
+    return {column: ids[:, k] for k, column in enumerate(id_columns(ids.shape[1]))}
+
+
+def sidecar_path(results_path):
+    return os.path.splitext(results_path)[0] + SUFFIX
+
+
+class Holdings:
+
+    def __init__(self, tickers, ids):
+        self.tickers = np.asarray(tickers)
+        self.ids = np.asarray(ids, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_frame(cls, results_df, tickers):
+        ids = results_df[columns_of(results_df)].to_numpy(dtype=np.int32)
+        return cls(tickers, ids.reshape(len(results_df), -1))
+
+    @classmethod
+    def from_names(cls, names, tickers=(), width=0):
+        """Encode comma-joined strings (legacy CSV columns) onto `tickers`, extending it with unknown names."""
+        tickers = list(tickers)
+        lookup = {ticker: i for i, ticker in enumerate(tickers)}
+        rows = [name.split(",") if isinstance(name, str) and name else [] for name in names]
+        ids = np.full((len(rows), max(width, *map(len, rows), 0)), -1, dtype=np.int32)
+        for i, row in enumerate(rows):
+            for k, ticker in enumerate(row):
+                if ticker not in lookup:
+                    lookup[ticker] = len(tickers)
+                    tickers.append(ticker)
+                ids[i, k] = lookup[ticker]
+        return cls(np.array(tickers, dtype=str), ids)
+
+    def names(self):
+        """String view: one comma-joined ticker list per row."""
+        names = np.append(self.tickers, "")[self.ids]
+        return [",".join(filter(None, row)) for row in names]
+
+    def remap(self, tickers):
+        """The same holdings coded onto `tickers`, extended with any names it lacks."""
+        tickers = list(tickers)
+        lookup = {ticker: i for i, ticker in enumerate(tickers)}
+        for ticker in self.tickers.tolist():
+            if ticker not in lookup:
+                lookup[ticker] = len(tickers)
+                tickers.append(ticker)
+        codes = np.array([lookup[ticker] for ticker in self.tickers.tolist()], dtype=np.int32)
+        ids = np.where(self.ids >= 0, codes[np.maximum(self.ids, 0)], -1)
+        return Holdings(np.array(tickers, dtype=str), ids)
+
+    def overlap(self, other):
+        """Number of names each row shares with the same row of `other` (same dictionary)."""
+        same = (self.ids[:, :, None] == other.ids[:, None, :]) & (self.ids >= 0)[:, :, None]
+        return same.any(axis=2).sum(axis=1)
+
+    def turnover(self):
+        """Fraction of each row's names that were not held in the row before (NaN for the first)."""
+        held = (self.ids >= 0).sum(axis=1)
+        kept = np.zeros(len(self.ids))
+        kept[1:] = Holdings(self.tickers, self.ids[1:]).overlap(Holdings(self.tickers, self.ids[:-1]))
+        turnover = np.where(held > 0, 1 - kept / np.maximum(held, 1), np.nan)
+        turnover[:1] = np.nan
+        return turnover
+
+    def frequency(self):
+        """How many rows hold each ticker, most frequent first."""
+        counts = np.bincount(self.ids[self.ids >= 0], minlength=len(self.tickers))
+        counts = pd.Series(counts, index=self.tickers)
+        return counts[counts > 0].sort_values(ascending=False, kind="stable")
+
+    def save(self, path, params=None):
+        """Write the codes and dictionary, plus a results file's run parameters if given."""
+        tmp_path = path + ".tmp.npz"
+        extra = {"params": json.dumps(params)} if params else {}
+        np.savez(tmp_path, tickers=self.tickers, ids=self.ids, **extra)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["tickers"], data["ids"])
+
+
+def string_view(results_df, tickers):
+    """Results frame with the id columns replaced by the comma-joined column of the CSV layout.
+
+    Sweep tables get a "holdings" column, single configurations top_<N>.
+    """
+    id_cols = columns_of(results_df)
+    name = "holdings" if "top_n" in results_df.columns else f"top_{len(id_cols)}"
+    view = results_df.drop(columns=id_cols)
+    view.insert(results_df.columns.get_loc(id_cols[0]), name, Holdings.from_frame(results_df, tickers).names())
+    return view
+
+
+def _current_sidecar(path):
+    # The sidecar of a results CSV, unless the CSV was rewritten after it
+    sidecar = sidecar_path(path)
+    if os.path.exists(sidecar) and os.path.getmtime(sidecar) >= os.path.getmtime(path):
+        return sidecar
+    return None
+
+
+def saved_params(path):
+    """Run parameters kept beside an exported results CSV, {} without a current sidecar."""
+    sidecar = _current_sidecar(path)
+    if sidecar is None:
+        return {}
+    with np.load(sidecar) as data:
+        return json.loads(str(data["params"])) if "params" in data.files else {}
+
+
+def load_results(path, tickers=()):
+    """Read an exported results CSV back to a frame with id columns.
+
+    Codes come from the .holdings.npz next to the file when it matches,
+    otherwise the string column is encoded. Returns (frame, tickers): the
+    dictionary is `tickers` extended with any names the file adds.
+    """
+    # round_trip keeps the returns of rewritten rows bit-identical
+    results_df = pd.read_csv(path, dtype={"formation_month": str}, float_precision="round_trip")
+    if "top_n" in results_df.columns:
+        name, width = "holdings", int(results_df["top_n"].max())
+    else:
+        name = next(column for column in results_df.columns if column.startswith("top_"))
+        width = int(name.split("_")[1])
+    sidecar = _current_sidecar(path)
+    holdings = Holdings.load(sidecar) if sidecar else None
+    if holdings is None or len(holdings) != len(results_df):
+        holdings = Holdings.from_names(results_df[name].tolist(), width=width)
+    holdings = holdings.remap(tickers)
+
+    position = results_df.columns.get_loc(name)
+    results_df = results_df.drop(columns=[name])
+    for offset, (column, values) in enumerate(as_columns(holdings.ids).items()):
+        results_df.insert(position + offset, column, values)
+    return results_df, holdings.tickers
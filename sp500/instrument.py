@@ -0,0 +1,160 @@
+import os
+import sys
+import json
+import time
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Run instrumentation: where the time, the requests and the memory go.
+#
+#   with instrument.phase("prices"): ...      wall time per named phase
+#   instrument.count("store_hits")             counters (requests, bytes, cache hits/misses)
+#   instrument.record_month("2010-03", secs)   wall time per formation month
+#   instrument.emit("run.stats.json")          JSON summary at the end of a run
+#
+# `requests` counts the HTTP requests the fetcher charges to its rate limit,
+# for every network source. Response sizes are only visible for an http(s)
+# price server (price_server_requests, price_server_bytes): yfinance keeps
+# Yahoo's responses inside its own shared session.
+#
+# State is module-global and per process; pool workers send back a
+# snapshot() that the parent merge()s. configure() turns on tracemalloc and
+# the live progress line, which cost time and are off by default.
+_lock = threading.Lock()
+_config = {"progress": False, "trace_memory": False}
+_state = {}
+
+
+def configure(progress=None, trace_memory=None):
+    if progress is not None:
+        _config["progress"] = progress
+    if trace_memory is not None:
+        _config["trace_memory"] = trace_memory
+
+
+def reset():
+    """Start a new run: clear all timings and counters."""
+    with _lock:
+        _state.clear()
+        _state.update(started=time.perf_counter(), phases={}, counters={}, months={}, workers=[])
+    if _config["trace_memory"]:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+
+
+@contextmanager
+def phase(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        with _lock:
+            entry = _state.setdefault("phases", {}).setdefault(name, {"seconds": 0.0, "calls": 0})
+            entry["seconds"] += seconds
+            entry["calls"] += 1
+
+
+def count(name, n=1):
+    with _lock:
+        counters = _state.setdefault("counters", {})
+        counters[name] = counters.get(name, 0) + n
+
+
+def record_month(label, seconds):
+    with _lock:
+        months = _state.setdefault("months", {})
+        months[label] = months.get(label, 0.0) + seconds
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process, or None where unsupported."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def snapshot():
+    """Picklable copy of this process's timings and counters, for merge()."""
+    with _lock:
+        return {
+            "phases": {name: dict(entry) for name, entry in _state.get("phases", {}).items()},
+            "counters": dict(_state.get("counters", {})),
+            "months": dict(_state.get("months", {})),
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+
+def merge(other):
+    """Add a worker's snapshot() into this process's totals."""
+    with _lock:
+        for name, entry in other["phases"].items():
+            mine = _state.setdefault("phases", {}).setdefault(name, {"seconds": 0.0, "calls": 0})
+            mine["seconds"] += entry["seconds"]
+            mine["calls"] += entry["calls"]
+        counters = _state.setdefault("counters", {})
+        for name, n in other["counters"].items():
+            counters[name] = counters.get(name, 0) + n
+        _state.setdefault("months", {}).update(other["months"])
+        _state.setdefault("workers", []).append(other["peak_rss_mb"])
+
+
+def summary():
+    wall = time.perf_counter() - _state["started"] if "started" in _state else None
+    report = snapshot()
+    report["wall_seconds"] = wall
+    report["formation_months"] = len(report["months"]) or report["counters"].get("formation_months", 0)
+    if wall:
+        report["months_per_sec"] = report["formation_months"] / wall
+    report["worker_peak_rss_mb"] = [rss for rss in _state.get("workers", []) if rss is not None]
+    if tracemalloc.is_tracing():
+        report["tracemalloc_peak_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    return report
+
+
+def emit(path=None):
+    """Print the run summary as JSON and, with `path`, also save it there."""
+    report = summary()
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if path:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as fh:
+            fh.write(text + "\n")
+        os.replace(tmp_path, path)
+    print(f"📊 Run stats:\n{text}")
+    return report
+
+
+class Progress:
+    """Live one-line progress (done/total, months/sec, ETA) on stderr when enabled."""
+
+    def __init__(self, total, unit="months", enabled=None):
+        self.total = total
+        self.unit = unit
+        self.done = 0
+        self.start = time.perf_counter()
+        self.enabled = _config["progress"] if enabled is None else enabled
+
+    def update(self, n=1):
+        self.done += n
+        if not self.enabled:
+            return
+        elapsed = time.perf_counter() - self.start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - self.done) / rate if rate > 0 else float("nan")
+        sys.stderr.write(f"\r⏱️ {self.done}/{self.total} {self.unit}  {rate:.1f} {self.unit}/sec  ETA {eta:.0f}s ")
+        sys.stderr.flush()
+
+    def close(self):
+        if self.enabled:
+            sys.stderr.write("\n")
+            sys.stderr.flush()
@@ -0,0 +1,70 @@
+import os
+import json
+import hashlib
+
+# Append-only JSONL journal of finished work units (formation months, fetched
+# tickers, ...). Every line carries a hash of the run's inputs, so a resumed
+# run only trusts entries written by a run with the same parameters and data.
+# Each record is flushed and fsynced before the next unit starts; a line torn
+# by a crash is ignored on reload.
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def inputs_hash(*parts, files=()):
+    """Short hash of JSON-able run parameters plus the contents of input files."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(json.dumps(part, sort_keys=True, default=str).encode())
+    for path in files:
+        h.update(file_digest(path).encode() if os.path.exists(path) else b"missing")
+    return h.hexdigest()[:16]
+
+
+def _to_json(value):
+    # numpy scalars coming out of DataFrame rows
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+class Journal:
+
+    def __init__(self, path, inputs, resume=True):
+        self.path = path
+        self.inputs = inputs
+        self.entries = {}
+        if resume and os.path.exists(path):
+            self._load()
+        else:
+            open(path, "w").close()
+
+    def _load(self):
+        with open(self.path) as fh:
+            content = fh.read()
+        for line in content.splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("inputs") == self.inputs:
+                self.entries[record["key"]] = record["value"]
+        # Start the next record on a fresh line after a torn one
+        if content and not content.endswith("\n"):
+            with open(self.path, "a") as fh:
+                fh.write("\n")
+
+    def done(self, key):
+        return key in self.entries
+
+    def record(self, key, value):
+        line = json.dumps({"inputs": self.inputs, "key": key, "value": value}, default=_to_json)
+        with open(self.path, "a") as fh:
+            fh.write(line + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        self.entries[key] = value
@@ -0,0 +1,199 @@
+import os
+import csv
+
+import numpy as np
+import pandas as pd
+
+import instrument
+
+# Compiled point-in-time S&P 500 membership.
+#
+# The constituent CSVs store one comma-joined ticker string per snapshot date.
+# Compiling them once interns every ticker to an integer id and keeps
+#   dates     - sorted snapshot dates
+#   bitmap    - snapshots x tickers membership matrix
+#   intervals - (ticker_id, start, end) runs of continuous membership
+# so "who was in the index on date D" is a binary search plus one row read.
+# The CSV is streamed row by row and each row is interned to ids as it is
+# read, so the ticker strings are never held in memory together. Every
+# snapshot date is kept; the backtest picks its month ends with mask().
+# The compiled index is saved next to the CSV as <name>.membership.npz and
+# reused until the CSV changes or INDEX_VERSION moves on.
+INDEX_SUFFIX = ".membership.npz"
+# Bumped whenever compiling the same CSV gives different dates or ids
+INDEX_VERSION = 2
+# deltas.py histories, accepted wherever a constituent CSV is
+DELTA_SUFFIX = ".delta.npz"
+INTERVAL_DTYPE = np.dtype([("ticker_id", "i4"), ("start", "datetime64[D]"), ("end", "datetime64[D]")])
+
+
+class MembershipIndex:
+
+    def __init__(self, tickers, dates, bitmap):
+        self.tickers = np.asarray(tickers)
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.bitmap = np.asarray(bitmap, dtype=bool)
+        self.ticker_ids = {ticker: i for i, ticker in enumerate(self.tickers.tolist())}
+
+    def __len__(self):
+        return len(self.dates)
+
+    def _row(self, date):
+        # Last snapshot at or before `date`, or -1 before the history starts
+        return np.searchsorted(self.dates, np.datetime64(pd.Timestamp(date), "D"), "right") - 1
+
+    def ids_on(self, date):
+        """Integer ticker ids in the index on `date` (any day, not just snapshot dates)."""
+        row = self._row(date)
+        if row < 0:
+            return np.empty(0, dtype=np.int32)
+        return np.flatnonzero(self.bitmap[row]).astype(np.int32)
+
+    def constituents(self, date):
+        """Ticker symbols in the index on `date`."""
+        return self.tickers[self.ids_on(date)].tolist()
+
+    def mask(self, dates):
+        """dates x tickers boolean membership matrix for many dates at once."""
+        dates = np.asarray(pd.DatetimeIndex(dates).values.astype("datetime64[D]"))
+        rows = np.searchsorted(self.dates, dates, "right") - 1
+        out = self.bitmap[np.clip(rows, 0, None)]
+        out[rows < 0] = False
+        return out
+
+    def month_ends(self):
+        """Every month-end from the first to the last snapshot."""
+        months = np.arange(self.dates[0].astype("datetime64[M]"), self.dates[-1].astype("datetime64[M]") + 1)
+        return pd.DatetimeIndex((months + 1).astype("datetime64[D]") - 1)
+
+    def intervals(self):
+        """Structured array of (ticker_id, start, end) membership runs; `end` is exclusive."""
+        padded = np.zeros((len(self.dates) + 2, len(self.tickers)), dtype=np.int8)
+        padded[1:-1] = self.bitmap
+        edges = np.diff(padded, axis=0)
+        # Dates past the last snapshot are open-ended
+        bounds = np.append(self.dates, np.datetime64("9999-12-31", "D"))
+
+        # nonzero() on the transpose walks ticker by ticker in date order, so
+        # the n-th start and the n-th end belong to the same run
+        start_ids, start_rows = np.nonzero(edges.T == 1)
+        end_ids, end_rows = np.nonzero(edges.T == -1)
+
+        runs = np.empty(len(start_ids), dtype=INTERVAL_DTYPE)
+        runs["ticker_id"] = start_ids
+        runs["start"] = bounds[start_rows]
+        runs["end"] = bounds[end_rows]
+        return runs
+
+    def save(self, path):
+        np.savez(
+            path,
+            version=INDEX_VERSION,
+            tickers=self.tickers,
+            dates=self.dates,
+            bitmap=np.packbits(self.bitmap, axis=1),
+            intervals=self.intervals(),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            tickers = data["tickers"]
+            bitmap = np.unpackbits(data["bitmap"], axis=1, count=len(tickers)).astype(bool)
+            return cls(tickers, data["dates"], bitmap)
+
+
+def iter_rows(csv_path):
+    """Yield (raw date, comma-joined tickers) rows of a constituent history CSV, one at a time."""
+    with open(csv_path, newline="") as fh:
+        reader = csv.reader(fh)
+        header = next(reader)
+        date_col, tickers_col = header.index("date"), header.index("tickers")
+        for row in reader:
+            if row:
+                yield row[date_col], row[tickers_col]
+
+
+def parse_date(value, csv_path=""):
+    """datetime64[D] of a CSV date; anything that is not a date raises ValueError."""
+    try:
+        # Plain ISO dates, i.e. every row of the cleaned files, skip pandas
+        date = np.datetime64(value, "D")
+    except ValueError:
+        try:
+            date = np.datetime64(pd.Timestamp(value), "D")
+        except (ValueError, TypeError):
+            date = np.datetime64("NaT")
+    if np.isnat(date):
+        raise ValueError(f"Not a date in {csv_path or 'constituent CSV'}: {value!r}")
+    return date
+
+
+def read_snapshots(csv_path, period="D"):
+    """(dates, ticker dictionary, id arrays) of the last snapshot in each period, in date order.
+
+    `period` is "D" (every distinct date), "M" (month) or "Y". Rows may come
+    in any order; ids are assigned in file order as rows are read.
+    """
+    ticker_ids = {}
+    latest = {}
+    for value, ticker_string in iter_rows(csv_path):
+        date = parse_date(value, csv_path)
+        key = date.astype(f"datetime64[{period}]")
+        held = latest.get(key)
+        if held is None or date >= held[0]:
+            ids = [ticker_ids.setdefault(ticker, len(ticker_ids)) for ticker in ticker_string.split(",") if ticker]
+            latest[key] = (date, np.array(ids, dtype=np.int32))
+    kept = [latest[key] for key in sorted(latest)]
+    dates = np.array([date for date, _ in kept], dtype="datetime64[D]")
+    return dates, list(ticker_ids), [ids for _, ids in kept]
+
+
+def compile_membership(csv_path, period="D"):
+    """Stream a constituent history CSV (date,tickers) into a MembershipIndex of its snapshots."""
+    dates, tickers, snapshots = read_snapshots(csv_path, period)
+    bitmap = np.zeros((len(snapshots), len(tickers)), dtype=bool)
+    rows = np.repeat(np.arange(len(snapshots)), [len(ids) for ids in snapshots])
+    # One scatter fills the bitmap
+    bitmap[rows, np.concatenate(snapshots) if snapshots else np.empty(0, dtype=np.int32)] = True
+    return MembershipIndex(tickers, dates, bitmap)
+
+
+def index_version(path):
+    """INDEX_VERSION a compiled index was written with, 0 before versions were stored."""
+    with np.load(path) as data:
+        return int(data["version"]) if "version" in data.files else 0
+
+
+def index_path(csv_path):
+    return os.path.splitext(csv_path)[0] + INDEX_SUFFIX
+
+
+def load_membership(csv_path):
+    """Load the compiled index for a constituent CSV, compiling it on first use.
+
+    A delta history written by deltas.py is expanded instead.
+    """
+    path = index_path(csv_path)
+    with instrument.phase("membership"):
+        if csv_path.endswith(DELTA_SUFFIX):
+            import deltas
+
+            return deltas.DeltaHistory.load(csv_path).to_index()
+        if (os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(csv_path)
+                and index_version(path) == INDEX_VERSION):
+            instrument.count("membership_cache_hits")
+            return MembershipIndex.load(path)
+        instrument.count("membership_cache_misses")
+        index = compile_membership(csv_path)
+        index.save(path)
+        return index
+
+
+if __name__ == "__main__":
+    import sys
+
+    for csv_path in sys.argv[1:] or ["sp500_cleaned.csv"]:
+        index = compile_membership(csv_path)
+        index.save(index_path(csv_path))
+        print(f"✅ {csv_path}: {len(index)} snapshots, {len(index.tickers)} tickers -> {index_path(csv_path)}")
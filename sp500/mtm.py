@@ -1,4 +1,4 @@
-import yfinance as yf
+import price_store
 import pandas as pd
 from datetime import timedelta
 
@@ -16,43 +16,14 @@ tickers = ticker_string.split(',')[:]  # Use only first 5 tickers to test
 start_date = (sample_date - timedelta(days=7)).strftime('%Y-%m-%d')
 end_date = (sample_date + pd.offsets.MonthEnd(1) + timedelta(days=7)).strftime('%Y-%m-%d')
 
-# Validate tickers and download data
-valid_tickers = []
-invalid_tickers = []
-
-for ticker in tickers:
-    try:
-        # Test downloading data for each ticker
-        data = yf.download(
-            tickers=ticker,
-            start=start_date,
-            end=end_date,
-            interval='1mo',
-            group_by='ticker',
-            auto_adjust=True,
-            progress=False
-        )
-        if not data.empty:
-            valid_tickers.append(ticker)
-        else:
-            invalid_tickers.append(ticker)
-    except Exception as e:
-        print(f"Error with ticker {ticker}: {e}")
-        invalid_tickers.append(ticker)
+# Validate tickers and download data in one batched request
+frames, invalid_tickers = price_store.bulk_download(tickers, start_date, end_date)
+valid_tickers = list(frames)
 
 print(f"Valid tickers: {valid_tickers}")
 print(f"Invalid tickers: {invalid_tickers}")
 
-# Download data for valid tickers only
-price_data = yf.download(
-    tickers=valid_tickers,
-    start=start_date,
-    end=end_date,
-    interval='1mo',
-    group_by='ticker',
-    auto_adjust=True,
-    progress=True
-)
+price_data = pd.concat(frames, axis=1)
 
 print(price_data.isna().sum())
 cleaned_data = price_data.dropna(axis=1, how='all')
@@ -0,0 +1,151 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import engine
+import instrument
+import membership
+import price_store
+import providers
+
+# Random-portfolio null distribution for the top-N selection.
+#
+# For every formation month, `draws` random N-name portfolios are drawn
+# from the names the momentum ranking could have picked that month (index
+# constituents with a formation signal) and held for the following month,
+# equal-weighted like the momentum portfolio. Each month's eligible ids are
+# packed to the front of a row, so a draw is N positions into that row: all
+# months x draws x N positions come from one batched integer draw, rows
+# that drew a name twice are redrawn together until none do, and the
+# portfolios' returns are one gather on the return matrix. The momentum
+# portfolio's percentile in that distribution says whether ranking beat
+# picking at random, month by month and over the whole run.
+#
+#   python nulldist.py sp500_cleaned.csv --top-n 10 --draws 10000
+#   python nulldist.py sp500_cleaned.csv --lookback 11 --skip 1 --output null.csv
+DRAWS = 10000
+
+
+def eligible_pool(eligible):
+    """(months x names ids with each month's eligible ids first, eligible count per month)."""
+    pool = np.argsort(~eligible, axis=1, kind="stable").astype(np.int32)
+    return pool, eligible.sum(axis=1)
+
+
+def _repeats(picks):
+    # Rows of positions that drew some position more than once
+    ordered = np.sort(picks, axis=-1)
+    return (ordered[..., 1:] == ordered[..., :-1]).any(axis=-1)
+
+
+def random_portfolios(eligible, draws=DRAWS, top_n=10, seed=0):
+    """months x draws x top_n ids of uniformly random top_n-subsets of each month's eligible names.
+
+    Months with top_n or fewer eligible names hold all of them, padded with
+    -1 like select_top's output; months with none are all -1.
+    """
+    rng = np.random.default_rng(seed)
+    pool, sizes = eligible_pool(eligible)
+    picks = rng.integers(0, np.maximum(sizes, 1)[:, None, None], (len(pool), draws, top_n), dtype=np.int32)
+    small = sizes <= top_n
+    picks[small] = np.arange(top_n, dtype=np.int32)
+
+    # Rejection keeps every subset equally likely; few rows repeat a name when N << names
+    months, rows = np.nonzero(_repeats(picks) & ~small[:, None])
+    while len(months):
+        picks[months, rows] = rng.integers(0, sizes[months][:, None], (len(months), top_n), dtype=np.int32)
+        again = _repeats(picks[months, rows])
+        months, rows = months[again], rows[again]
+
+    ids = np.take_along_axis(pool[:, None, :], np.minimum(picks, pool.shape[1] - 1), axis=2)
+    return np.where(picks < sizes[:, None, None], ids, -1)
+
+
+def null_returns(next_returns, eligible, draws=DRAWS, top_n=10, seed=0):
+    """months x draws next-month returns of random portfolios, NaN where a month had no names."""
+    portfolios = random_portfolios(eligible, draws, top_n, seed)
+    with np.errstate(invalid="ignore"):
+        return engine.portfolio_returns(next_returns[:, None, :], portfolios)
+
+
+def percentile_of(values, distribution):
+    """Mid-rank percentile (0-100) of each value in its row of `distribution`, ignoring NaN."""
+    values = np.asarray(values, dtype=np.float64)[..., None]
+    n = np.isfinite(distribution).sum(axis=-1)
+    rank = (distribution < values).sum(axis=-1) + 0.5 * (distribution == values).sum(axis=-1)
+    return np.where(n > 0, rank / np.maximum(n, 1) * 100, np.nan)
+
+
+def null_distribution(members, returns, months, top_n=10, stride=1, lag=2, lookback=1, skip=0, draws=DRAWS, seed=0):
+    """Momentum vs random portfolios, one row per formation month, and the run's overall summary.
+
+    The frame has formation_month, momentum_return, the null's mean, 5th,
+    50th and 95th percentile returns, and the momentum return's percentile.
+    The summary compares the momentum strategy's mean monthly return with
+    the mean monthly return of each random draw (re-drawn every month).
+    """
+    rows = engine.formation_rows(months, engine.formation_months(members, stride, lag))
+    instrument.count("formation_months", len(rows))
+    with instrument.phase("ranking"):
+        universe = engine.universe_mask(members, months, rows, lag)
+        signal = engine.formation_signal(returns, lookback, skip)[rows]
+        momentum = engine.select_top(signal, universe, top_n)
+        eligible = universe & np.isfinite(signal)
+    with instrument.phase("aggregation"):
+        next_returns = returns[rows + 1]
+        momentum_return = engine.portfolio_returns(next_returns, momentum)
+        null = null_returns(next_returns, eligible, draws, top_n, seed)
+
+    keep = np.isfinite(momentum_return)
+    momentum_return, null = momentum_return[keep], null[keep]
+    with np.errstate(invalid="ignore"):
+        p05, p50, p95 = np.nanpercentile(null, [5, 50, 95], axis=1)
+        frame = pd.DataFrame({
+            "formation_month": engine._month_labels(months[rows[keep]]),
+            "momentum_return": momentum_return,
+            "null_mean": np.nanmean(null, axis=1),
+            "null_p05": p05,
+            "null_p50": p50,
+            "null_p95": p95,
+            "percentile": percentile_of(momentum_return, null),
+        })
+        draw_means = np.nanmean(null, axis=0)
+    summary = {
+        "months": int(len(frame)),
+        "momentum_mean": float(momentum_return.mean()),
+        "null_mean": float(np.nanmean(draw_means)),
+        "percentile": float(percentile_of(momentum_return.mean(), draw_means)),
+        "months_above_median": float((frame["percentile"] > 50).mean()),
+    }
+    return frame, summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Momentum portfolio vs random portfolios from the same constituents")
+    parser.add_argument("membership", nargs="?", default="sp500_cleaned.csv")
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--stride", type=int, default=1, help="months between formation dates")
+    parser.add_argument("--lookback", type=int, default=1, help="formation lookback in months")
+    parser.add_argument("--skip", type=int, default=0, help="months skipped between lookback window and formation")
+    parser.add_argument("--lag", type=int, default=2, help="months from constituent snapshot to formation")
+    parser.add_argument("--draws", type=int, default=DRAWS, help="random portfolios per month")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--store", default=price_store.STORE_DIR)
+    parser.add_argument("--source", default=None, help="read prices from a provider (replay:DIR, yahoo, URL) instead of the store")
+    parser.add_argument("--output", default=None, help="save the per-month table as CSV")
+    args = parser.parse_args()
+    provider = providers.from_spec(args.source) if args.source else price_store.StoreProvider(args.store)
+
+    members = membership.load_membership(args.membership)
+    months = engine.month_grid(members, args.lag, history=args.lookback + args.skip - 1)
+    returns = engine.load_returns(members, months, provider)
+    frame, summary = null_distribution(members, returns, months, args.top_n, args.stride, args.lag, args.lookback,
+                                       args.skip, args.draws, args.seed)
+    if args.output:
+        frame.to_csv(args.output, index=False)
+        print(f"✅ Saved to {args.output}")
+    print(frame.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    print(f"\n📊 Momentum mean monthly return {summary['momentum_mean']:.4f} vs random {summary['null_mean']:.4f}: "
+          f"percentile {summary['percentile']:.1f} of {args.draws} draws, "
+          f"above the random median in {summary['months_above_median']:.0%} of {summary['months']} months")
@@ -0,0 +1,289 @@
+import os
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import journal
+import instrument
+import membership
+import providers
+import symbols
+from fetcher import Fetcher
+
+# Local price store: one .npy file per ticker per bar interval, e.g.
+#   price_store/1mo/AAPL.npy
+# Each file is a date-sorted structured array of OHLCV bars that is
+# memory-mapped on read, so a backtest never touches the network once the
+# store has been filled by `python price_store.py fetch`.
+STORE_DIR = "price_store"
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+AVAILABILITY_FILE = "_availability.npz"
+FETCH_JOURNAL_FILE = "_fetch.journal.jsonl"
+BAR_DTYPE = np.dtype([("date", "datetime64[D]")] + [(field, "f8") for field in FIELDS])
+
+_availability_cache = {}
+
+
+def ticker_path(ticker, interval="1mo", store_dir=STORE_DIR):
+    return os.path.join(store_dir, interval, f"{ticker}.npy")
+
+
+def write_ticker(ticker, frame, interval="1mo", store_dir=STORE_DIR):
+    """Write one ticker's OHLCV frame (DatetimeIndex rows) to the store."""
+    frame = frame.sort_index()
+    bars = np.empty(len(frame), dtype=BAR_DTYPE)
+    bars["date"] = frame.index.values.astype("datetime64[D]")
+    for field in FIELDS:
+        bars[field] = frame[field].to_numpy(dtype="f8") if field in frame else np.nan
+
+    path = ticker_path(ticker, interval, store_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to a temp file first so a killed fetch never leaves a torn file
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as fh:
+        np.save(fh, bars)
+    os.replace(tmp_path, path)
+    # The availability index holds this file's digest; rebuilt on next use
+    index = availability_path(interval, store_dir)
+    if os.path.exists(index):
+        os.remove(index)
+    _availability_cache.pop(index, None)
+
+
+def read_ticker(ticker, interval="1mo", store_dir=STORE_DIR):
+    """Memory-map one ticker's bars, or None if it is not in the store."""
+    path = ticker_path(ticker, interval, store_dir)
+    if not os.path.exists(path):
+        instrument.count("store_misses")
+        return None
+    instrument.count("store_hits")
+    return np.load(path, mmap_mode="r")
+
+
+def _date_slice(bars, start=None, end=None):
+    # `start` is inclusive and `end` exclusive, like yf.download
+    dates = bars["date"]
+    lo = 0 if start is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(start), "D"), "left")
+    hi = len(dates) if end is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(end), "D"), "left")
+    return bars[lo:hi]
+
+
+def load_prices(tickers, start=None, end=None, field="Close", interval="1mo", store_dir=STORE_DIR):
+    """Return a dates x tickers frame of one price field, read from the store.
+
+    Tickers that are missing from the store, or have no bars in the window,
+    are left out of the result.
+    """
+    columns = {}
+    for ticker in tickers:
+        bars = read_ticker(ticker, interval, store_dir)
+        if bars is None:
+            continue
+        window = _date_slice(bars, start, end)
+        if len(window) == 0:
+            continue
+        columns[ticker] = pd.Series(np.asarray(window[field]), index=pd.DatetimeIndex(window["date"]))
+    return pd.DataFrame(columns)
+
+
+class StoreProvider(providers.PriceProvider):
+    """The local store behind the provider interface; reads never touch the network."""
+
+    batch_size = 1000
+
+    def __init__(self, store_dir=STORE_DIR):
+        self.store_dir = store_dir
+
+    def download(self, tickers, start, end, interval="1mo"):
+        frames = {}
+        for ticker in tickers:
+            bars = read_ticker(ticker, interval, self.store_dir)
+            if bars is None:
+                continue
+            window = _date_slice(bars, start, end)
+            if len(window):
+                frames[ticker] = pd.DataFrame({field: np.asarray(window[field]) for field in FIELDS},
+                                              index=pd.DatetimeIndex(window["date"]))
+        return frames
+
+    def close_panel(self, tickers, start=None, end=None, interval="1mo", field="Close"):
+        return load_prices(tickers, start, end, field, interval, self.store_dir)
+
+    def fingerprint(self):
+        # Covers every bar, not just date ranges, so revised prices change it
+        if not stored_tickers(store_dir=self.store_dir):
+            return "empty"
+        return store_digest(store_dir=self.store_dir)
+
+
+def stored_tickers(interval="1mo", store_dir=STORE_DIR):
+    folder = os.path.join(store_dir, interval)
+    if not os.path.isdir(folder):
+        return []
+    return sorted(name[:-4] for name in os.listdir(folder) if name.endswith(".npy"))
+
+
+def availability_path(interval="1mo", store_dir=STORE_DIR):
+    return os.path.join(store_dir, interval, AVAILABILITY_FILE)
+
+
+def build_availability(interval="1mo", store_dir=STORE_DIR):
+    """Write the per-ticker first/last bar date and file digest index for one interval."""
+    tickers = stored_tickers(interval, store_dir)
+    first = np.full(len(tickers), np.datetime64("NaT"), dtype="datetime64[D]")
+    last = first.copy()
+    digests = []
+    for i, ticker in enumerate(tickers):
+        dates = read_ticker(ticker, interval, store_dir)["date"]
+        if len(dates):
+            first[i], last[i] = dates[0], dates[-1]
+        digests.append(journal.file_digest(ticker_path(ticker, interval, store_dir)))
+    np.savez(availability_path(interval, store_dir), tickers=np.array(tickers), first=first, last=last,
+             digest=np.array(digests, dtype="U64"))
+    _availability_cache.pop(availability_path(interval, store_dir), None)
+
+
+def store_digest(interval="1mo", store_dir=STORE_DIR):
+    """Hash of every stored file's digest, from the availability index."""
+    path = availability_path(interval, store_dir)
+    if os.path.exists(path):
+        with np.load(path) as index:
+            if "digest" in index.files:
+                return journal.inputs_hash(index["tickers"].tolist(), index["digest"].tolist())
+    # Missing, or written before digests were kept
+    build_availability(interval, store_dir)
+    return store_digest(interval, store_dir)
+
+
+def load_availability(interval="1mo", store_dir=STORE_DIR):
+    """Return {ticker: (first_date, last_date)}, building the index if needed."""
+    path = availability_path(interval, store_dir)
+    if not os.path.exists(path):
+        build_availability(interval, store_dir)
+    mtime = os.path.getmtime(path)
+    cached = _availability_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        instrument.count("availability_cache_misses")
+        with np.load(path) as index:
+            lookup = dict(zip(index["tickers"].tolist(), zip(index["first"], index["last"])))
+        cached = _availability_cache[path] = (mtime, lookup)
+    else:
+        instrument.count("availability_cache_hits")
+    return cached[1]
+
+
+def available(tickers, start, end, interval="1mo", store_dir=STORE_DIR):
+    """Tickers with at least one stored bar in [start, end), without opening their files."""
+    lookup = load_availability(interval, store_dir)
+    start = np.datetime64(pd.Timestamp(start), "D")
+    end = np.datetime64(pd.Timestamp(end), "D")
+    valid = []
+    for ticker in tickers:
+        span = lookup.get(ticker)
+        if span is not None and span[0] < end and span[1] >= start:
+            valid.append(ticker)
+    return valid
+
+
+def membership_tickers(path):
+    """Every ticker that ever appears in a constituent history CSV."""
+    tickers = set()
+    for _, ticker_string in membership.iter_rows(path):
+        tickers.update(ticker_string.split(","))
+    tickers.discard("")
+    return sorted(tickers)
+
+
+def bulk_download(tickers, start, end, interval="1mo", fetcher=None):
+    """Download many tickers through the rate-limited fetcher.
+
+    Returns ({ticker: OHLCV frame}, [tickers with no data]) so callers can
+    validate a whole month's universe without one request per ticker.
+    Symbols the registry knows to be dead are not requested again.
+    """
+    return (fetcher or Fetcher(registry=symbols.load())).fetch(list(tickers), start, end, interval)
+
+
+def fetch(tickers, start, end=None, interval="1mo", store_dir=STORE_DIR, resume=False, fetcher=None):
+    """One-time fill of the store, fetched concurrently within the rate limit.
+
+    Every finished request is journaled; with resume=True the tickers already
+    fetched for the same window and interval are skipped. end=None fetches
+    up to today and is journaled as open-ended, so a fetch resumed on a
+    later day still skips what was done.
+    """
+    os.makedirs(os.path.join(store_dir, interval), exist_ok=True)
+    log = journal.Journal(
+        os.path.join(store_dir, interval, FETCH_JOURNAL_FILE),
+        journal.inputs_hash(start, end, interval),
+        resume
+    )
+    end = end or pd.Timestamp.today().strftime('%Y-%m-%d')
+    todo = [ticker for ticker in tickers if not log.done(ticker)]
+    if resume:
+        print(f"⏩ Resuming: {len(tickers) - len(todo)} of {len(tickers)} tickers already fetched")
+
+    fetcher = fetcher or Fetcher(registry=symbols.load())
+    stored, missing, failed = [], [], []
+    progress = instrument.Progress(len(todo), unit="tickers")
+    for batch, frames, batch_failed in fetcher.fetch_batches(todo, start, end, interval):
+        with instrument.phase("store"):
+            for ticker in batch:
+                if ticker in frames:
+                    write_ticker(ticker, frames[ticker], interval, store_dir)
+                    stored.append(ticker)
+                elif ticker in batch_failed:
+                    # Not journaled, so --resume asks for it again
+                    failed.append(ticker)
+                    continue
+                else:
+                    missing.append(ticker)
+                log.record(ticker, ticker in frames)
+        progress.update(len(batch))
+        if not progress.enabled:
+            print(f"⬇️ Fetched {len(stored) + len(missing) + len(failed)} of {len(todo)} tickers")
+    progress.close()
+
+    build_availability(interval, store_dir)
+    print(f"✅ Stored: {len(stored)} tickers")
+    print(f"⚠️ No data: {len(missing)} tickers")
+    if failed:
+        print(f"⚠️ Failed: {len(failed)} tickers (rerun with --resume to retry them)")
+    return stored, missing
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fill or inspect the local price store")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    fetch_cmd = sub.add_parser("fetch", help="download every ticker in a constituent file into the store")
+    fetch_cmd.add_argument("membership", nargs="?", default="sp500_cleaned.csv")
+    fetch_cmd.add_argument("--start", default="2003-12-01")
+    fetch_cmd.add_argument("--end", default=None, help="end date, exclusive (default: today; resumable on later days)")
+    fetch_cmd.add_argument("--interval", default="1mo")
+    fetch_cmd.add_argument("--store", default=STORE_DIR)
+    fetch_cmd.add_argument("--resume", action="store_true", help="skip tickers an interrupted fetch already stored")
+    fetch_cmd.add_argument("--workers", type=int, default=4, help="concurrent requests")
+    fetch_cmd.add_argument("--rate", type=float, default=2.0, help="HTTP requests per second (Yahoo makes one per ticker)")
+    fetch_cmd.add_argument("--source", default=None, help="yahoo, replay:DIR, record:DIR or an http(s) URL")
+    fetch_cmd.add_argument("--stats", default=None, help="also save the JSON run stats to this file")
+    fetch_cmd.add_argument("--progress", action="store_true", help="live progress line with tickers/sec and ETA")
+    fetch_cmd.add_argument("--symbols", default=symbols.REGISTRY_PATH, help="symbol registry of dead symbols and aliases")
+    fetch_cmd.add_argument("--no-symbols", action="store_true", help="request every symbol and record nothing")
+
+    list_cmd = sub.add_parser("list", help="list tickers already in the store")
+    list_cmd.add_argument("--interval", default="1mo")
+    list_cmd.add_argument("--store", default=STORE_DIR)
+
+    args = parser.parse_args()
+    if args.command == "fetch":
+        instrument.configure(progress=args.progress)
+        instrument.reset()
+        registry = None if args.no_symbols else symbols.load(args.symbols)
+        fetcher = Fetcher(providers.from_spec(args.source), workers=args.workers, rate=args.rate, registry=registry)
+        fetch(membership_tickers(args.membership), args.start, args.end, args.interval, args.store, args.resume, fetcher)
+        instrument.emit(args.stats)
+    else:
+        tickers = stored_tickers(args.interval, args.store)
+        print(f"{len(tickers)} tickers in {os.path.join(args.store, args.interval)}")
@@ -0,0 +1,266 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+import instrument
+
+# Price providers: every source of OHLCV bars behind one interface.
+#
+#   provider.download(tickers, start, end, interval) -> {ticker: frame}
+#
+# Frames are indexed by bar date with Open/High/Low/Close/Volume columns;
+# tickers without data are simply absent, and tickers whose request failed
+# raise PartialDownload with the rest. `start` is inclusive and `end`
+# exclusive, like yf.download. `batch_size` tells the fetcher how many
+# tickers one call should carry, `requests(tickers)` how many HTTP requests
+# such a call makes, which is what the fetcher's rate limit charges.
+#
+#   YahooProvider   - yfinance, one request per ticker (network)
+#   HttpProvider    - one CSV per ticker from a plain HTTP server
+#   ReplayProvider  - recorded responses from local CSV files (offline, deterministic)
+#   RecordingProvider - wraps another provider and records what it returns
+#   MemoryProvider  - frames held in a dict, for tests and benchmarks
+#   price_store.StoreProvider - the local memory-mapped store (what backtests use)
+#
+# `from_spec()` builds one from a short string so scripts can switch source
+# with the MOMENTUM_PRICE_SOURCE environment variable.
+SOURCE_ENV = "MOMENTUM_PRICE_SOURCE"
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+# Errors of a Yahoo request that mean throttled
+RATE_LIMIT_MARKERS = ("YFRateLimitError", "Too Many Requests", "Rate limited")
+# ... and these mean the symbol simply has no bars; anything else is an error
+NO_DATA_MARKERS = ("possibly delisted", "no price data found", "no timezone found", "Data doesn't exist",
+                   "No data found", "YFTzMissingError", "YFPricesMissingError")
+
+
+class RateLimited(Exception):
+    """Raised by a provider when the server asks us to slow down."""
+
+
+class PartialDownload(Exception):
+    """Raised by a provider when some tickers of a call errored; carries the frames that did come back."""
+
+    def __init__(self, frames, failed, message=""):
+        super().__init__(message or f"{len(failed)} tickers failed")
+        self.frames = frames
+        self.failed = list(failed)
+
+
+def _window(frame, start, end):
+    frame = frame.sort_index()
+    if start is not None:
+        frame = frame[frame.index >= pd.Timestamp(start)]
+    if end is not None:
+        frame = frame[frame.index < pd.Timestamp(end)]
+    return frame
+
+
+class PriceProvider:
+
+    batch_size = 100
+    # Remote sources are fetched through fetcher.Fetcher
+    network = False
+
+    def download(self, tickers, start, end, interval="1mo"):
+        raise NotImplementedError
+
+    def requests(self, tickers):
+        """HTTP requests one download() of `tickers` makes."""
+        return 1
+
+    def close_panel(self, tickers, start=None, end=None, interval="1mo", field="Close"):
+        """dates x tickers frame of one field."""
+        frames = self.download(list(tickers), start, end, interval)
+        columns = {ticker: frame[field].astype(np.float64) for ticker, frame in frames.items()}
+        return pd.DataFrame(columns)
+
+    def fingerprint(self):
+        """Identifies the data a run saw, for checkpoint journals."""
+        return type(self).__name__
+
+
+class YahooProvider(PriceProvider):
+    """yfinance, one Ticker.history request per ticker.
+
+    Each request raises its own errors instead of logging them into
+    yf.download's process-wide table, so the fetcher's worker threads run
+    them concurrently.
+    """
+
+    batch_size = 25
+    network = True
+
+    def __init__(self, session=None):
+        self.session = session
+
+    def requests(self, tickers):
+        return len(tickers)
+
+    def _history(self, ticker, start, end, interval):
+        import yfinance as yf
+
+        return yf.Ticker(ticker, session=self.session).history(
+            start=start,
+            end=end,
+            interval=interval,
+            auto_adjust=True,
+            actions=False,
+            raise_errors=True
+        )
+
+    def download(self, tickers, start, end, interval="1mo"):
+        frames, failed, error = {}, [], None
+        for ticker in tickers:
+            try:
+                frame = self._history(ticker, start, end, interval)
+            except Exception as e:
+                message = f"{type(e).__name__}: {e}"
+                if any(marker in message for marker in RATE_LIMIT_MARKERS):
+                    raise RateLimited(f"{ticker}: {message}") from e
+                if not any(marker in message for marker in NO_DATA_MARKERS):
+                    failed.append(ticker)
+                    error = error or message
+                continue
+            frame = frame.dropna(how='all')
+            if not frame.empty:
+                # Bars come back in the exchange's time zone; the store keeps dates
+                frame.index = frame.index.tz_localize(None)
+                frames[ticker] = frame
+        if failed:
+            raise PartialDownload(frames, failed, f"{len(failed)} of {len(tickers)} tickers failed: {error}")
+        return frames
+
+
+class HttpProvider(PriceProvider):
+    """One CSV per ticker from a plain HTTP server, e.g. a local stand-in for tests.
+
+    GET {base_url}/{interval}/{ticker}.csv?start=...&end=... returns
+    Date,Open,High,Low,Close,Volume rows; 404 means no data and 429 means
+    slow down.
+    """
+
+    batch_size = 1
+    network = True
+
+    def requests(self, tickers):
+        return len(tickers)
+
+    def __init__(self, base_url, session=None, timeout=30):
+        import requests
+
+        self.base_url = base_url.rstrip("/")
+        self.session = session or requests.Session()
+        self.timeout = timeout
+
+    def download(self, tickers, start, end, interval="1mo"):
+        frames = {}
+        for ticker in tickers:
+            response = self.session.get(
+                f"{self.base_url}/{interval}/{ticker}.csv",
+                params={"start": start, "end": end},
+                timeout=self.timeout,
+            )
+            instrument.count("price_server_requests")
+            instrument.count("price_server_bytes", len(response.content))
+            if response.status_code == 429:
+                raise RateLimited(f"{ticker}: HTTP 429")
+            if response.status_code == 404:
+                continue
+            response.raise_for_status()
+            frame = pd.read_csv(io.StringIO(response.text), parse_dates=["Date"], index_col="Date")
+            if not frame.empty:
+                frames[ticker] = frame
+        return frames
+
+
+class ReplayProvider(PriceProvider):
+    """Serve recorded bars from {directory}/{interval}/{ticker}.csv."""
+
+    batch_size = 500
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def fingerprint(self):
+        return f"replay:{os.path.abspath(self.directory)}"
+
+    def path(self, ticker, interval):
+        return os.path.join(self.directory, interval, f"{ticker}.csv")
+
+    def download(self, tickers, start, end, interval="1mo"):
+        frames = {}
+        for ticker in tickers:
+            path = self.path(ticker, interval)
+            if not os.path.exists(path):
+                continue
+            frame = _window(pd.read_csv(path, parse_dates=["Date"], index_col="Date"), start, end)
+            if not frame.empty:
+                frames[ticker] = frame
+        return frames
+
+
+class RecordingProvider(PriceProvider):
+    """Pass requests through to `inner` and save its answers for a ReplayProvider."""
+
+    def __init__(self, inner, directory):
+        self.inner = inner
+        self.replay = ReplayProvider(directory)
+        self.batch_size = inner.batch_size
+        self.network = inner.network
+
+    def requests(self, tickers):
+        return self.inner.requests(tickers)
+
+    def download(self, tickers, start, end, interval="1mo"):
+        frames = self.inner.download(tickers, start, end, interval)
+        for ticker, frame in frames.items():
+            path = self.replay.path(ticker, interval)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if os.path.exists(path):
+                recorded = pd.read_csv(path, parse_dates=["Date"], index_col="Date")
+                frame = pd.concat([recorded, frame])
+                frame = frame[~frame.index.duplicated(keep="last")]
+            frame.sort_index().rename_axis("Date")[FIELDS].to_csv(path)
+        return frames
+
+
+class MemoryProvider(PriceProvider):
+    """Frames held in memory: {interval: {ticker: frame}} or {ticker: frame} for one interval."""
+
+    batch_size = 1000
+
+    def __init__(self, frames, interval="1mo"):
+        if frames and all(isinstance(value, dict) for value in frames.values()):
+            self.frames = frames
+        else:
+            self.frames = {interval: dict(frames)}
+
+    def download(self, tickers, start, end, interval="1mo"):
+        available = self.frames.get(interval, {})
+        frames = {}
+        for ticker in tickers:
+            if ticker in available:
+                frame = _window(available[ticker], start, end)
+                if not frame.empty:
+                    frames[ticker] = frame
+        return frames
+
+
+def from_spec(spec=None):
+    """Build a provider from "yahoo", "replay:DIR", "record:DIR" or an http(s) URL.
+
+    Without a spec, MOMENTUM_PRICE_SOURCE is used, falling back to Yahoo.
+    """
+    spec = spec or os.environ.get(SOURCE_ENV, "yahoo")
+    if spec == "yahoo":
+        return YahooProvider()
+    if spec.startswith("replay:"):
+        return ReplayProvider(spec[len("replay:"):])
+    if spec.startswith("record:"):
+        return RecordingProvider(YahooProvider(), spec[len("record:"):])
+    if spec.startswith(("http://", "https://")):
+        return HttpProvider(spec)
+    raise ValueError(f"Unknown price source: {spec}")
+
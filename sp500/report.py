@@ -0,0 +1,169 @@
+import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+import benchmark
+import results
+
+# Headless batch report renderer.
+#
+# Renders cumulative-return charts of strategies, alone or against SPY,
+# straight to PNG or SVG files; nothing is shown on screen, so hundreds of
+# sweep strategies can be charted unattended. SPY comes from the cached
+# benchmark series (benchmark.py), loaded once per run and handed once to
+# each worker when rendering fans out over a process pool.
+#
+# Portfolio returns are fractions. Each formation month's return is plotted
+# at the end of its holding month, and SPY is compounded over exactly the
+# months the strategy held, so both lines start from the same date.
+#
+#   python report.py                                # the charts graph.py used to draw
+#   python report.py sweep.arrow --top-n 10         # one chart per strategy in a results file
+#   python report.py sweep.arrow --workers 0 --format svg --out-dir charts
+OUT_DIR = "reports"
+
+# The combined results the old graph.py functions plotted:
+# (file, chart name, title), each drawn alone and against SPY
+GRAPH_RESULTS = [
+    ("combined_momentum_portfolio_results.csv", "top5_1mon", "Momentum Portfolio (top 5 stocks, 1 month)"),
+    ("mom10_comb.csv", "top10_1mon", "Momentum Portfolio (top 10 stocks, 1 month)"),
+    ("mom_res_comb.csv", "top10_6mon", "Momentum Portfolio (top 10 stocks, 6 month)"),
+    ("res_12_comb.csv", "top10_12mon", "Momentum Portfolio (top 10 stocks, 12 month)"),
+]
+
+_spy = None
+
+
+def _set_spy(spy):
+    # Pool initializer: every worker gets the series once, not per chart
+    global _spy
+    _spy = spy
+
+
+def _month_ends(months):
+    return pd.DatetimeIndex((months + 1).astype("datetime64[D]") - 1)
+
+
+def holding_returns(formation_month, portfolio_return):
+    """Portfolio returns indexed by the end of each holding month (the month after formation), in date order."""
+    months = pd.to_datetime(formation_month).values.astype("datetime64[M]")
+    # Combined shard files are not always in date order
+    returns = pd.Series(np.asarray(portfolio_return, dtype=np.float64), index=_month_ends(months + 1))
+    return returns.sort_index(kind="stable")
+
+
+def _chart_labels(params):
+    # (file name, title) of a strategy from the parameters its results file records
+    name = "_".join(label.format(params[key]) for key, label in
+                    [("top_n", "top{}"), ("stride", "stride{}"), ("lookback", "look{}"), ("skip", "skip{}"),
+                     ("holding", "hold{}")] if key in params)
+    parts = [f"top {params['top_n']}"] if "top_n" in params else []
+    if "lookback" in params:
+        parts.append(f"{params['lookback']}-{params.get('skip', 0)} lookback")
+    if "stride" in params:
+        parts.append(f"every {params['stride']} months")
+    if "holding" in params:
+        parts.append(f"held {params['holding']}")
+    return name, f"Momentum Portfolio ({', '.join(parts)})"
+
+
+def strategy_charts(path, benchmark=True, **where):
+    """Charts for every strategy in a results file, optionally filtered by parameter values."""
+    results_df, keys = results.returns_frame(path, **where)
+    if set(keys) <= {"top_n"}:
+        # A single-configuration CSV, named after its file like graph.py did
+        name = os.path.splitext(os.path.basename(path))[0]
+        return [{"name": name, "title": name, "returns": holding_returns(results_df["formation_month"],
+                                                                         results_df["portfolio_return"]),
+                 "benchmark": benchmark}]
+
+    charts = []
+    for params, group in results_df.groupby(keys, sort=True):
+        name, title = _chart_labels(dict(zip(keys, params)))
+        charts.append({
+            "name": name,
+            "title": title,
+            "returns": holding_returns(group["formation_month"], group["portfolio_return"]),
+            "benchmark": benchmark,
+        })
+    return charts
+
+
+def graph_charts():
+    """The SPY chart plus every combined result alone and against SPY, as graph.py drew them."""
+    charts = [{"name": "spy", "title": "SPY Cumulative Return Over Time", "returns": None, "benchmark": True}]
+    for path, name, title in GRAPH_RESULTS:
+        if not os.path.exists(path):
+            print(f"⚠️ Skipping {path}: not found")
+            continue
+        returns = strategy_charts(path)[0]["returns"]
+        charts.append({"name": name, "title": title, "returns": returns, "benchmark": False})
+        charts.append({"name": f"{name}_vs_spy", "title": f"{title} vs SPY", "returns": returns, "benchmark": True})
+    return charts
+
+
+def render(chart, out_dir=OUT_DIR, fmt="png"):
+    """Draw one chart to <out_dir>/<name>.<fmt> and return the path."""
+    fig, ax = plt.subplots(figsize=(12, 6))
+    returns = chart["returns"]
+    if returns is None:
+        # Benchmark on its own, at daily resolution
+        ax.plot(_spy.dates, _spy.daily_cumulative * 100, label="SPY ETF", color="blue")
+    else:
+        cumulative = (1 + returns).cumprod() - 1
+        ax.plot(cumulative.index, cumulative * 100, label="Momentum Portfolio", linewidth=2)
+        if chart["benchmark"]:
+            spy_returns = _spy.month_returns(returns.index.values.astype("datetime64[M]"))
+            spy_cumulative = np.cumprod(1 + np.nan_to_num(spy_returns)) - 1
+            ax.plot(returns.index, spy_cumulative * 100, label="SPY ETF", linestyle="--")
+
+    ax.set_title(chart["title"])
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Cumulative Return (%)")
+    ax.grid(True)
+    ax.legend()
+    ax.tick_params(axis="x", labelrotation=45)
+    fig.tight_layout()
+
+    path = os.path.join(out_dir, f"{chart['name']}.{fmt}")
+    fig.savefig(path)
+    plt.close(fig)
+    return path
+
+
+def render_all(charts, spy, out_dir=OUT_DIR, fmt="png", workers=1):
+    """Render every chart, on `workers` processes (0 = all cores), and return the file paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    if workers == 1:
+        _set_spy(spy)
+        return [render(chart, out_dir, fmt) for chart in charts]
+    with ProcessPoolExecutor(max_workers=workers or None, initializer=_set_spy, initargs=(spy,)) as pool:
+        return list(pool.map(render, charts, [out_dir] * len(charts), [fmt] * len(charts)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render strategy vs SPY charts to image files")
+    parser.add_argument("results", nargs="*", help="results files (columnar or CSV); default: the combined CSVs graph.py plotted")
+    parser.add_argument("--out-dir", default=OUT_DIR)
+    parser.add_argument("--format", choices=["png", "svg"], default="png")
+    parser.add_argument("--workers", type=int, default=1, help="rendering processes (0 = all cores)")
+    parser.add_argument("--spy", default=benchmark.SOURCE, help="SPY daily closes CSV")
+    parser.add_argument("--no-benchmark", action="store_true", help="plot strategies without SPY")
+    for name in results.PARAMS:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, nargs="+", default=None,
+                            help=f"only strategies with these {name} values")
+    args = parser.parse_args()
+
+    where = {name: getattr(args, name) for name in results.PARAMS if getattr(args, name) is not None}
+    if args.results:
+        charts = [chart for path in args.results for chart in strategy_charts(path, not args.no_benchmark, **where)]
+    else:
+        charts = graph_charts()
+    paths = render_all(charts, benchmark.load(args.spy), args.out_dir, args.format, args.workers)
+    print(f"✅ Rendered {len(paths)} charts to {args.out_dir}")
@@ -0,0 +1,256 @@
+import os
+import json
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import holdings
+import instrument
+
+# Typed columnar results.
+#
+# Backtests and sweeps are stored as uncompressed Arrow IPC (Feather v2)
+# files with one row per strategy and formation month:
+#   top_n, stride, lookback, skip, holding, lag   int16 strategy parameters
+#   formation_month                               date32, first day of the month
+#   portfolio_return                              float64
+#   holding_1..holding_N                          int32 ids (see holdings.py)
+# The ticker dictionary and the run kind live in the schema metadata.
+# read() memory-maps the file, touches only the requested columns, filters
+# strategies on the parameter columns before converting anything, and hands
+# back numeric columns without copying them. CSV in the stage scripts'
+# layout is an export:
+#
+#   python results.py export sweep.arrow sweep.csv
+#   python results.py import mom10_comb.csv mom10.arrow --stride 1 --lookback 1 --skip 0 --holding 1 --lag 2
+PARAMS = ["top_n", "stride", "lookback", "skip", "holding", "lag"]
+COLUMNAR_SUFFIXES = (".arrow", ".feather")
+# Parameters of files that predate a column, e.g. single-month holding
+DEFAULTS = {"lookback": 1, "skip": 0, "holding": 1, "lag": 2}
+
+
+def is_columnar(path):
+    return path.endswith(COLUMNAR_SUFFIXES)
+
+
+def write(results_df, tickers, path, kind="backtest", **params):
+    """Write an engine results frame (holding_k id columns) as a columnar file.
+
+    `params` fill the parameter columns a frame does not carry itself, e.g.
+    top_n and stride for a single backtest.
+    """
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    columns = {}
+    for name in PARAMS:
+        values = results_df[name] if name in results_df else params.get(name, DEFAULTS.get(name))
+        columns[name] = pa.array(np.broadcast_to(np.asarray(values, dtype=np.int16), len(results_df)))
+    months = pd.PeriodIndex(results_df["formation_month"], freq="M").to_timestamp()
+    columns["formation_month"] = pa.array(months.values.astype("datetime64[D]"), type=pa.date32())
+    columns["portfolio_return"] = pa.array(results_df["portfolio_return"].to_numpy(dtype=np.float64))
+    for name in holdings.columns_of(results_df):
+        columns[name] = pa.array(results_df[name].to_numpy(dtype=np.int32))
+
+    meta = {"kind": kind, "tickers": np.asarray(tickers).tolist()}
+    table = pa.table(columns).replace_schema_metadata({"momentum": json.dumps(meta)})
+    tmp_path = path + ".tmp"
+    with instrument.phase("write"):
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+
+
+def _open(path):
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    return feather.read_table(pa.memory_map(path), memory_map=True)
+
+
+def metadata(path):
+    """{"kind": "backtest" | "sweep", "tickers": [...]} of a columnar file."""
+    return json.loads(_open(path).schema.metadata[b"momentum"])
+
+
+def _select(path, columns=None, **where):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    table = _open(path)
+    mask = None
+    for name, value in where.items():
+        values = pa.array(np.atleast_1d(value), type=table.schema.field(name).type)
+        condition = pc.is_in(table[name], value_set=values)
+        mask = condition if mask is None else pc.and_(mask, condition)
+    if columns is not None:
+        table = table.select(columns)
+    return table if mask is None else table.filter(mask)
+
+
+def read(path, columns=None, **where):
+    """Load some columns of some strategies as a frame, e.g. read(path, ["formation_month", "portfolio_return"], top_n=10).
+
+    Keyword filters take one value or a list of values per parameter.
+    """
+    with instrument.phase("read_results"):
+        return _select(path, columns, **where).to_pandas(split_blocks=True, date_as_object=False)
+
+
+def arrays(path, columns, **where):
+    """{column: numpy array}; without filters, numeric columns are views into the mapped file."""
+    table = _select(path, columns, **where).combine_chunks()
+    return {name: table[name].to_numpy() for name in table.column_names}
+
+
+def strategies(path):
+    """Distinct parameter combinations in a columnar file."""
+    return read(path, PARAMS).drop_duplicates(ignore_index=True)
+
+
+def export_csv(results_df, tickers, path, **params):
+    """Write results in the stage scripts' CSV layout, with the int-coded holdings beside it.
+
+    The file gets the comma-joined string view; <path>.holdings.npz keeps
+    the ids and their ticker dictionary for holdings analysis, and `params`,
+    the run parameters the CSV has no columns for.
+    """
+    # Readers never see a half-written results file
+    tmp_path = path + ".tmp"
+    with instrument.phase("write"):
+        holdings.string_view(results_df, tickers).to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        holdings.Holdings.from_frame(results_df, tickers).save(holdings.sidecar_path(path), params)
+
+
+def save(results_df, tickers, path, kind="backtest", **params):
+    """Columnar file for .arrow/.feather paths, CSV export otherwise."""
+    if is_columnar(path):
+        write(results_df, tickers, path, kind, **params)
+    else:
+        export_csv(results_df, tickers, path, **params)
+
+
+def load(path, tickers=()):
+    """Read results back to an engine frame: (frame, tickers, kind).
+
+    Works on columnar files and exported CSVs. The dictionary is `tickers`
+    extended with any names the file adds, so ids of new rows built on
+    `tickers` stay valid next to the loaded ones.
+    """
+    if not is_columnar(path):
+        results_df, tickers = holdings.load_results(path, tickers)
+        return results_df, tickers, "sweep" if "top_n" in results_df.columns else "backtest"
+
+    meta = metadata(path)
+    table = read(path)
+    coded = holdings.Holdings.from_frame(table, meta["tickers"]).remap(tickers)
+    keys = ["top_n", "stride", "lookback", "skip"] if meta["kind"] == "sweep" else []
+    results_df = table[keys].astype(np.int64)
+    results_df["formation_month"] = table["formation_month"].dt.strftime('%Y-%m')
+    for name, values in holdings.as_columns(coded.ids).items():
+        results_df[name] = values
+    results_df["portfolio_return"] = table["portfolio_return"]
+    return results_df, coded.tickers, meta["kind"]
+
+
+def returns_frame(path, **where):
+    """(frame of strategy parameters, formation_month and portfolio_return, parameter columns) of a results file.
+
+    Columnar files carry every parameter. CSV exports carry the ones they
+    were written with: the grid columns of a sweep, top_n (from the top_<N>
+    column) of a single backtest, and any saved in their sidecar. Filters
+    on a parameter a CSV does not record are reported and ignored. Rows
+    repeating a strategy and month, as combined shard files do at shard
+    edges, are averaged.
+    """
+    if is_columnar(path):
+        frame = read(path, PARAMS + ["formation_month", "portfolio_return"], **where)
+    else:
+        header = pd.read_csv(path, nrows=0).columns
+        frame = pd.read_csv(path, usecols=[name for name in PARAMS if name in header] + ["formation_month", "portfolio_return"],
+                            dtype={"formation_month": str})
+        width = [column[4:] for column in header if column.startswith("top_") and column[4:].isdigit()]
+        if width and "top_n" not in frame:
+            frame.insert(0, "top_n", int(width[0]))
+        for name, value in saved_params(path).items():
+            if name not in frame:
+                frame[name] = value
+        for name, value in where.items():
+            if name in frame:
+                frame = frame[frame[name].isin(np.atleast_1d(value))]
+            else:
+                print(f"⚠️ {path} does not record {name}; ignoring the {name} filter")
+        frame = frame.assign(formation_month=pd.to_datetime(frame["formation_month"]))
+    keys = [name for name in PARAMS if name in frame]
+
+    repeated = frame.duplicated(keys + ["formation_month"], keep=False)
+    if repeated.any():
+        print(f"⚠️ {path}: {int(repeated.sum())} rows repeat a strategy and formation month; averaging them")
+        frame = frame.groupby(keys + ["formation_month"], as_index=False, sort=False)["portfolio_return"].mean()
+    return frame.reset_index(drop=True), keys
+
+
+def import_params(path, results_df, kind, **given):
+    """Parameters to write a results CSV with as a columnar file.
+
+    Those the file records (its columns, the top_<N> width of a single
+    backtest, its sidecar) plus `given` for the rest. Raises ValueError
+    for a parameter that is neither recorded nor given, or given
+    differently from the file, instead of stamping a default on it.
+    """
+    params = dict(saved_params(path))
+    if kind == "backtest":
+        params["top_n"] = len(holdings.columns_of(results_df))
+    conflicts = [f"{name}={params[name]}" for name, value in given.items()
+                 if value is not None and name in params and params[name] != value]
+    if conflicts:
+        raise ValueError(f"{path} was run with {', '.join(conflicts)}")
+    params.update({name: value for name, value in given.items() if value is not None})
+    unknown = [name for name in PARAMS if name not in results_df and name not in params]
+    if unknown:
+        raise ValueError(f"{path} does not record {', '.join(unknown)}; pass "
+                         + " ".join(f"--{name.replace('_', '-')}" for name in unknown))
+    return {name: value for name, value in params.items() if name not in results_df}
+
+
+def saved_params(path):
+    """Parameters every row of a results file shares, as far as the file records them.
+
+    Columnar files record all of them; CSV exports those saved in their
+    sidecar by export_csv, so the stage scripts' CSVs record none.
+    """
+    if not is_columnar(path):
+        return holdings.saved_params(path)
+    frame = read(path, PARAMS)
+    return {name: int(frame[name].iloc[0]) for name in PARAMS if len(frame) and frame[name].nunique() == 1}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert between columnar results and CSV exports")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export_cmd = sub.add_parser("export", help="write a columnar results file as CSV")
+    export_cmd.add_argument("source")
+    export_cmd.add_argument("target")
+
+    import_cmd = sub.add_parser("import", help="convert a results CSV to a columnar file")
+    import_cmd.add_argument("source")
+    import_cmd.add_argument("target")
+    for name in PARAMS:
+        import_cmd.add_argument(f"--{name.replace('_', '-')}", type=int, default=None,
+                                help="run parameter the source does not record (required then)")
+
+    args = parser.parse_args()
+    if args.command == "export":
+        results_df, tickers, kind = load(args.source)
+        saved = saved_params(args.source)
+        export_csv(results_df, tickers, args.target, **{name: saved[name] for name in saved if name not in results_df})
+    else:
+        results_df, tickers, kind = load(args.source)
+        try:
+            params = import_params(args.source, results_df, kind, **{name: getattr(args, name) for name in PARAMS})
+        except ValueError as e:
+            parser.error(str(e))
+        write(results_df, tickers, args.target, kind, **params)
+    print(f"✅ Saved to {args.target}")
@@ -1,22 +1,19 @@
-import yfinance as yf
 import pandas as pd
 
+import providers
+
 tickers_to_check = ['AABA']
 start_date = '2004-03-01'
 end_date = '2004-03-31'
 
 results = []
 
+# Yahoo by default; set MOMENTUM_PRICE_SOURCE=replay:<dir> to probe recorded data offline
+provider = providers.from_spec()
+
 for ticker in tickers_to_check:
     try:
-        data = yf.download(
-            tickers=ticker,
-            start=start_date,
-            end=end_date,
-            interval='1mo',
-            auto_adjust=True,
-            progress=False
-        )
+        data = provider.download([ticker], start_date, end_date).get(ticker, pd.DataFrame())
 
         if not data.empty:
             results.append({
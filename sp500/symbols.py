@@ -0,0 +1,228 @@
+import os
+import json
+import time
+import argparse
+from contextlib import contextmanager
+
+# Persistent symbol registry.
+#
+# Constituent files are full of symbols the price source cannot resolve:
+# bankrupt and delisted names (ABKFQ, CCTYQ), renamed ones (AABA) and share
+# classes spelled with a dot where Yahoo wants a dash (BF.B -> BF-B). The
+# registry remembers, across runs, what happened when each symbol was
+# requested:
+#   valid   - the source returned data for it at least once (under `alias`
+#             if it is spelled differently there)
+#   invalid - it never returned data in the probed window (`start`..`end`,
+#             open-ended where None); requests inside that window are
+#             skipped until `ttl_days` after the last probe, then tried again
+# The fetcher consults it before every request: known-invalid symbols are
+# not requested at all, aliases are requested under the source's spelling
+# and mapped back, and symbols that come back empty are recorded. An empty
+# window only says the symbol did not trade then (not yet listed, already
+# delisted), so a request outside it still goes out, and misses of a valid
+# symbol never turn it invalid. Sharded workers share the file: a save
+# merges with what the others saved since it was loaded.
+#
+#   python symbols.py list --status invalid
+#   python symbols.py alias BF.B BF-B
+#   python symbols.py import invalid_tickers.log
+#   python symbols.py forget AABA
+REGISTRY_PATH = "symbols.json"
+TTL_DAYS = 30
+DAY = 86400
+# Spellings known before any probe
+DEFAULT_ALIASES = {"BF.B": "BF-B", "BRK.B": "BRK-B"}
+
+
+def _day(value):
+    # Request bounds as comparable YYYY-MM-DD strings, None for open-ended
+    return None if value is None else str(value)[:10]
+
+
+def _inside(start, end, window_start, window_end):
+    # Whether start..end lies within the window; None bounds are open-ended
+    return ((window_start is None or (start is not None and start >= window_start))
+            and (window_end is None or (end is not None and end <= window_end)))
+
+
+def _overlap(start, end, window_start, window_end):
+    return ((start is None or window_end is None or start <= window_end)
+            and (end is None or window_start is None or window_start <= end))
+
+
+def _newer(entry, other):
+    # The entry to keep when two processes recorded the same symbol: valid
+    # beats invalid (as in record), otherwise the later probe
+    if other is None:
+        return entry
+    if entry["status"] != other["status"]:
+        return entry if entry["status"] == "valid" else other
+    return entry if entry.get("checked", 0) > other.get("checked", 0) else other
+
+
+@contextmanager
+def _locked(path, stale=30.0):
+    # Exclusive lock file next to the registry; one left by a killed process is broken after `stale` seconds
+    lock_path = path + ".lock"
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > stale:
+                    os.remove(lock_path)
+            except OSError:
+                pass
+            time.sleep(0.01)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.remove(lock_path)
+
+
+def candidates(symbol):
+    """Other spellings worth one probe when a symbol comes back empty, e.g. BF.B -> BF-B."""
+    return [symbol.replace(".", "-")] if "." in symbol else []
+
+
+class SymbolRegistry:
+
+    def __init__(self, entries=None, path=REGISTRY_PATH, ttl_days=TTL_DAYS):
+        self.entries = entries or {}
+        self.path = path
+        self.ttl = ttl_days * DAY
+        self.forgotten = set()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def status(self, symbol):
+        """"valid", "invalid" or None for a symbol never requested."""
+        entry = self.entries.get(symbol)
+        return entry["status"] if entry else None
+
+    def alias(self, symbol):
+        """The spelling to request `symbol` under."""
+        entry = self.entries.get(symbol)
+        if entry and entry.get("alias"):
+            return entry["alias"]
+        return DEFAULT_ALIASES.get(symbol, symbol)
+
+    def is_dead(self, symbol, start=None, end=None, now=None):
+        """Known invalid over the whole of start..end and probed within the TTL."""
+        entry = self.entries.get(symbol)
+        if not entry or entry["status"] != "invalid":
+            return False
+        if not _inside(_day(start), _day(end), entry.get("start"), entry.get("end")):
+            return False
+        return (now or time.time()) - entry["checked"] < self.ttl
+
+    def split(self, symbols, start=None, end=None, now=None):
+        """(symbols to request for start..end, known-dead symbols to skip)."""
+        now = now or time.time()
+        live, dead = [], []
+        for symbol in symbols:
+            (dead if self.is_dead(symbol, start, end, now) else live).append(symbol)
+        return live, dead
+
+    def set_alias(self, symbol, alias, now=None):
+        entry = self.entries.setdefault(symbol, {"status": "valid", "failures": 0})
+        entry.update(status="valid", alias=alias, checked=now or time.time())
+
+    def record(self, found, missing, start=None, end=None, now=None):
+        """Store the outcome of a request for start..end: `found` maps symbols to the spelling that returned data.
+
+        A missing symbol's empty window grows to cover both probes when they
+        overlap a window still within the TTL, otherwise it is replaced.
+        """
+        now = now or time.time()
+        start, end = _day(start), _day(end)
+        for symbol, spelling in found.items():
+            entry = self.entries.setdefault(symbol, {"failures": 0})
+            entry.update(status="valid", checked=now, failures=0)
+            if spelling != symbol:
+                entry["alias"] = spelling
+        for symbol in missing:
+            entry = self.entries.setdefault(symbol, {"status": "invalid", "failures": 0})
+            if entry["status"] == "valid":
+                continue
+            empty_start, empty_end = start, end
+            window_start, window_end = entry.get("start"), entry.get("end")
+            if "checked" in entry and now - entry["checked"] < self.ttl and _overlap(start, end, window_start,
+                                                                                     window_end):
+                empty_start = None if start is None or window_start is None else min(start, window_start)
+                empty_end = None if end is None or window_end is None else max(end, window_end)
+            entry.update(checked=now, failures=entry["failures"] + 1, start=empty_start, end=empty_end)
+
+    def forget(self, symbol):
+        self.forgotten.add(symbol)
+        return self.entries.pop(symbol, None) is not None
+
+    def save(self, path=None):
+        """Write the registry, merged with whatever other processes saved to `path` meanwhile."""
+        path = path or self.path
+        with _locked(path):
+            for symbol, entry in load(path).entries.items():
+                if symbol not in self.forgotten:
+                    self.entries[symbol] = _newer(entry, self.entries.get(symbol))
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as fh:
+                json.dump(self.entries, fh, indent=1, sort_keys=True)
+            os.replace(tmp_path, path)
+        self.forgotten.clear()
+
+
+def load(path=REGISTRY_PATH, ttl_days=TTL_DAYS):
+    """The registry saved at `path`, empty if there is none yet."""
+    entries = {}
+    if os.path.exists(path):
+        with open(path) as fh:
+            entries = json.load(fh)
+    return SymbolRegistry(entries, path, ttl_days)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect and edit the persistent symbol registry")
+    parser.add_argument("--registry", default=REGISTRY_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    list_cmd = sub.add_parser("list", help="show recorded symbols")
+    list_cmd.add_argument("--status", choices=["valid", "invalid"], default=None)
+
+    alias_cmd = sub.add_parser("alias", help="request SYMBOL under the source's spelling TARGET")
+    alias_cmd.add_argument("symbol")
+    alias_cmd.add_argument("target")
+
+    import_cmd = sub.add_parser("import", help="record the symbols of an invalid_tickers.log as invalid")
+    import_cmd.add_argument("log")
+
+    forget_cmd = sub.add_parser("forget", help="drop symbols so the next fetch probes them again")
+    forget_cmd.add_argument("symbols", nargs="+")
+
+    args = parser.parse_args()
+    registry = load(args.registry)
+    if args.command == "list":
+        for symbol, entry in sorted(registry.entries.items()):
+            if args.status in (None, entry["status"]):
+                checked = time.strftime("%Y-%m-%d", time.localtime(entry.get("checked", 0)))
+                alias = f" -> {entry['alias']}" if entry.get("alias") else ""
+                window = ""
+                if entry["status"] == "invalid":
+                    window = f" {entry.get('start') or '...'}..{entry.get('end') or '...'}"
+                print(f"{symbol}{alias}: {entry['status']}{window} (checked {checked}, "
+                      f"{entry.get('failures', 0)} failures)")
+    else:
+        if args.command == "alias":
+            registry.set_alias(args.symbol, args.target)
+        elif args.command == "import":
+            with open(args.log) as fh:
+                registry.record({}, [line.strip() for line in fh if line.strip()])
+        else:
+            for symbol in args.symbols:
+                if not registry.forget(symbol):
+                    print(f"⚠️ {symbol} is not in the registry")
+        registry.save()
+        print(f"✅ Saved {len(registry)} symbols to {args.registry}")
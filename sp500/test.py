@@ -1,4 +1,4 @@
-import yfinance as yf
+import price_store
 import pandas as pd
 import numpy as np
 from datetime import timedelta
@@ -22,37 +22,22 @@ for i in range(len(monthly_components) - (len(monthly_components)-2)):
     ticker_string = monthly_components.iloc[i]['tickers']
     tickers = list(set(ticker_string.split(',')))[:100]  # Limit to 200 max for API speed
 
-    # Validate tickers before downloading data
-    valid_tickers = []
-    for ticker in tickers:
-        try:
-            # Check if the ticker exists in Yahoo Finance
-            yf.Ticker(ticker).info  # This will raise an exception if the ticker is invalid
-            valid_tickers.append(ticker)
-        except Exception:
-            print(f"⚠️ Invalid or missing ticker: {ticker}")
-
-    # Proceed only with valid tickers
-    if not valid_tickers:
-        print(f"⚠️ No valid tickers for {sample_date.strftime('%Y-%m')}")
-        continue
-
     # Date range for two months
     start_date = (sample_date - timedelta(days=7)).strftime('%Y-%m-%d')
     end_date = (next_month_date + pd.offsets.MonthEnd(1) + timedelta(days=7)).strftime('%Y-%m-%d')
 
-    # Download price data for valid tickers
+    # Validate and download all tickers in one batched request
     try:
-        price_data = yf.download(
-            tickers=valid_tickers,
-            start=start_date,
-            end=end_date,
-            interval='1mo',
-            group_by='ticker',
-            auto_adjust=True,
-            progress=False,
-            threads=True
-        )
+        frames, invalid_tickers = price_store.bulk_download(tickers, start_date, end_date)
+        for ticker in invalid_tickers:
+            print(f"⚠️ Invalid or missing ticker: {ticker}")
+
+        # Proceed only with valid tickers
+        if not frames:
+            print(f"⚠️ No valid tickers for {sample_date.strftime('%Y-%m')}")
+            continue
+
+        price_data = pd.concat(frames, axis=1)
         cleaned_data = price_data.dropna(axis=1, how='all')
         
         # Save cleaned data to a CSV for debugging
@@ -0,0 +1,50 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The pipeline modules import each other by bare name, as the scripts run from sp500/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bench
+from providers import MemoryProvider
+
+# A small synthetic index shared by the tests: 30 members of a 60-name pool
+# over 4 years, with month-start random-walk closes for all but 3 names.
+NAMES, YEARS, SEED = 30, 4, 7
+
+
+def price_frames(pool, dates, seed=SEED):
+    """Month-start random-walk closes for most of the pool, some names never traded."""
+    rng = np.random.default_rng(seed)
+    bar_dates = pd.date_range(pd.Timestamp(dates[0]) - pd.DateOffset(months=1),
+                              pd.Timestamp(dates[-1]) + pd.DateOffset(months=3), freq="MS")
+    frames = {}
+    for ticker in pool[:-3]:
+        close = 50 * np.exp(np.cumsum(rng.normal(0.008, 0.08, len(bar_dates))))
+        frames[ticker] = pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1e6},
+                                      index=bar_dates)
+    return frames
+
+
+@pytest.fixture(scope="session")
+def index(tmp_path_factory):
+    """(month-end membership CSV, same history with mid-month rows, provider, (pool, dates, bitmap))."""
+    folder = tmp_path_factory.mktemp("index")
+    pool, dates, bitmap = bench.synthetic_membership(NAMES, YEARS, seed=SEED)
+    month_end_csv = str(folder / "members.csv")
+    bench.write_membership_csv(month_end_csv, pool, dates, bitmap)
+
+    # Mid-month snapshots with a few other names; the backtest must never see them
+    rng = np.random.default_rng(SEED)
+    daily = bitmap.copy()
+    for row in daily:
+        row[rng.choice(len(pool), 3, replace=False)] ^= True
+    mid_dates = dates.astype("datetime64[M]").astype("datetime64[D]") + 14
+    order = np.argsort(np.concatenate([mid_dates, dates]), kind="stable")
+    daily_csv = str(folder / "daily.csv")
+    bench.write_membership_csv(daily_csv, pool, np.concatenate([mid_dates, dates])[order],
+                               np.concatenate([daily, bitmap])[order])
+    return month_end_csv, daily_csv, MemoryProvider(price_frames(pool, dates)), (pool, dates, bitmap)
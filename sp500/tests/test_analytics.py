@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+import analytics
+import engine
+
+# Metrics against values worked out by hand, and the return matrix they run on.
+
+
+def test_drawdown_counts_losses_from_the_starting_capital():
+    returns = np.array([[-0.1, 0.05, 0.1], [-0.1, -0.1, -0.2], [0.05, 0.1, 0.3]])
+    max_drawdown, months = analytics.drawdowns(returns)
+    # Returns [-0.1, -0.1, 0.05] fall to 0.81 of the starting 1 and stay under it
+    # 1.05, then 0.945 and 1.0395, both under the 1.05 high
+    # 1.1, then 0.88, then a new high at 1.144
+    np.testing.assert_allclose(max_drawdown, [-0.19, -0.1, -0.2])
+    np.testing.assert_array_equal(months, [3, 2, 1])
+
+
+def test_drawdown_of_a_rising_column_is_zero():
+    max_drawdown, months = analytics.drawdowns(np.array([[0.01], [np.nan], [0.02]]))
+    assert max_drawdown[0] == 0 and months[0] == 0
+
+
+def test_sharpe_and_sortino_by_hand():
+    returns = np.array([[0.02], [-0.01], [0.03], [0.0]])
+    # mean 0.01, sample std sqrt(0.001 / 3), downside deviation sqrt(0.0001 / 4)
+    np.testing.assert_allclose(analytics.sharpe(returns), [0.01 / np.sqrt(0.001 / 3) * np.sqrt(12)])
+    np.testing.assert_allclose(analytics.sortino(returns), [0.01 / 0.005 * np.sqrt(12)])
+    np.testing.assert_allclose(analytics.sharpe(returns, risk_free=0.12), [0.0], atol=1e-12)
+
+
+def test_ratios_without_risk_are_nan_not_infinite():
+    returns = np.array([[0.01, 0.02], [0.02, 0.02], [0.03, 0.02]])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sortino = analytics.sortino(returns)
+        sharpe = analytics.sharpe(returns)
+    assert np.isnan(sortino).all()
+    assert np.isfinite(sharpe[0]) and np.isnan(sharpe[1])
+    table = analytics.summary(returns, bench_returns=np.zeros(3)).sort_values("sortino", ascending=False)
+    assert table["sortino"].isna().all()
+
+
+def test_beta_alpha_and_information_ratio_by_hand():
+    bench = np.array([0.01, -0.02, 0.02, 0.01])
+    returns = (2 * bench + 0.001)[:, None]
+    beta, alpha, tracking_error, information_ratio = analytics.relative(returns, bench)
+    np.testing.assert_allclose(beta, [2.0])
+    np.testing.assert_allclose(alpha, [0.012])
+    # Active returns are the benchmark's plus 0.001: mean 0.006, sample std 0.01 * sqrt(3)
+    np.testing.assert_allclose(tracking_error, [0.06])
+    np.testing.assert_allclose(information_ratio, [1.2])
+
+
+def test_annualized_return_and_hit_rate():
+    returns = np.array([[0.1], [-0.05], [np.nan], [0.02]])
+    np.testing.assert_allclose(analytics.annualized_return(returns), [(1.1 * 0.95 * 1.02) ** 4 - 1])
+    np.testing.assert_allclose(analytics.hit_rate(returns), [2 / 3])
+
+
+def test_sweep_csv_splits_into_strategies(index, tmp_path):
+    month_end_csv, _, provider, _ = index
+    output = str(tmp_path / "sweep.csv")
+    engine.run_sweep(month_end_csv, [3, 5], [1, 2], [1, 6], output, provider=provider)
+    months, strategies, matrix = analytics.return_matrix(output)
+    assert len(strategies) == matrix.shape[1] == 8
+    _, strategies, matrix = analytics.return_matrix(output, top_n=5, stride=1)
+    assert len(strategies) == 2 and (strategies["top_n"] == 5).all()
+
+
+def test_repeated_months_are_averaged(tmp_path):
+    path = str(tmp_path / "combined.csv")
+    pd.DataFrame({"formation_month": ["2004-09", "2004-09", "2004-10"], "top_2": ["A,B", "A,C", "B,C"],
+                  "portfolio_return": [0.01, 0.03, -0.02]}).to_csv(path, index=False)
+    months, _, matrix = analytics.return_matrix(path)
+    assert len(months) == 2
+    np.testing.assert_allclose(matrix[:, 0], [0.02, -0.02])
@@ -0,0 +1,53 @@
+import os
+
+import pandas as pd
+import pytest
+
+import engine
+import holdings
+import results
+
+# Appending new formation months to a results file against running the
+# whole history again.
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".arrow"])
+@pytest.mark.parametrize("params", [dict(top_n=5), dict(top_n=4, stride=6, holding=6), "sweep"])
+def test_append_equals_full_run(index, tmp_path, suffix, params):
+    if suffix == ".arrow":
+        pytest.importorskip("pyarrow")
+    month_end_csv, _, provider, _ = index
+    short_csv = str(tmp_path / "short.csv")
+    with open(month_end_csv) as fh:
+        lines = fh.readlines()
+    with open(short_csv, "w") as fh:
+        fh.writelines(lines[:30])
+
+    def run(csv, output):
+        if params == "sweep":
+            return engine.run_sweep(csv, [3, 5], [1, 2], [1, 6], output, provider=provider, skips=[0, 1])
+        return engine.run_backtest(csv, output=output, provider=provider, **params)
+
+    full, appended = str(tmp_path / f"full{suffix}"), str(tmp_path / f"appended{suffix}")
+    run(month_end_csv, full)
+    run(short_csv, appended)
+    engine.append_new_months(appended, month_end_csv, provider=provider)
+    expected, tickers, _ = results.load(full)
+    got, _, _ = results.load(appended, tickers)
+    pd.testing.assert_frame_equal(got, expected)
+    if suffix == ".csv":
+        with open(full) as a, open(appended) as b:
+            assert a.read() == b.read()
+
+
+def test_append_refuses_unknown_or_conflicting_parameters(index, tmp_path):
+    month_end_csv, _, provider, _ = index
+    output = str(tmp_path / "stride6.csv")
+    engine.run_backtest(month_end_csv, top_n=5, stride=6, output=output, provider=provider)
+    with pytest.raises(ValueError, match="stride=6"):
+        engine.append_new_months(output, month_end_csv, stride=1, provider=provider)
+
+    # The stage scripts' CSVs have no sidecar to say how they were run
+    os.remove(holdings.sidecar_path(output))
+    with pytest.raises(ValueError, match="does not record"):
+        engine.append_new_months(output, month_end_csv, provider=provider)
@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import benchmark
+
+# SPY series built once per source file and cached by its hash.
+
+
+def write_spy(path, closes, start="2004-01-28"):
+    dates = pd.bdate_range(start, periods=len(closes))
+    pd.DataFrame({"Date": dates.strftime("%Y-%m-%d"), "Close": closes}).to_csv(path, index=False)
+    return dates
+
+
+def test_monthly_series_by_hand(tmp_path):
+    path = str(tmp_path / "SPY.csv")
+    # Jan 28-30, Feb 2-27, Mar 1-...
+    closes = np.linspace(100, 130, 40)
+    dates = write_spy(path, closes)
+    spy = benchmark.load(path)
+
+    month_ends = pd.Series(closes, index=dates).groupby(dates.to_period("M")).last()
+    np.testing.assert_allclose(spy.month_close, month_ends.to_numpy())
+    np.testing.assert_allclose(spy.monthly_return[1:], month_ends.to_numpy()[1:] / month_ends.to_numpy()[:-1] - 1)
+    assert np.isnan(spy.monthly_return[0])
+    np.testing.assert_allclose(spy.daily_cumulative[-1], closes[-1] / closes[0] - 1)
+    months = np.array(["2003-12", "2004-02", "2004-03", "2010-01"], dtype="datetime64[M]")
+    returns = spy.month_returns(months)
+    assert np.isnan(returns[0]) and np.isnan(returns[3])
+    np.testing.assert_allclose(returns[1:3], spy.monthly_return[1:3])
+
+
+def test_cache_is_rebuilt_when_the_source_changes(tmp_path):
+    path = str(tmp_path / "SPY.csv")
+    write_spy(path, np.linspace(100, 130, 40))
+    first = benchmark.load(path)
+    cache = benchmark.cache_path(path)
+    assert os.path.exists(cache)
+
+    # Same contents: served from the cache file, even to a fresh process
+    benchmark._loaded.clear()
+    cached = benchmark.load(path)
+    assert cached.digest == first.digest
+    np.testing.assert_array_equal(cached.month_close, first.month_close)
+
+    # Revised closes: a new digest and new series, in memory and on disk
+    write_spy(path, np.linspace(100, 90, 40))
+    revised = benchmark.load(path)
+    assert revised.digest != first.digest and revised.closes[-1] == 90
+    benchmark._loaded.clear()
+    assert benchmark.load(path).closes[-1] == 90
+
+
+def test_every_layout_reads_the_same(tmp_path):
+    plain = str(tmp_path / "SPY_cleaned.csv")
+    closes = np.linspace(100, 110, 30)
+    dates = write_spy(plain, closes)
+    # yf.download's layout: Price/Ticker/Date header rows before the data
+    yahoo = str(tmp_path / "SPY_2004_2025.csv")
+    with open(yahoo, "w") as fh:
+        fh.write("Price,Close\nTicker,SPY\nDate,\n")
+        for date, close in zip(dates.strftime("%Y-%m-%d"), closes):
+            fh.write(f"{date},{float(close)!r}\n")
+    for got, expected in zip(benchmark.read_closes(yahoo), benchmark.read_closes(plain)):
+        np.testing.assert_array_equal(got, expected)
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+import bootstrap
+
+# Count-based bootstrap statistics against resampling the months one by one.
+
+
+def naive_bootstrap(returns, bench, n_resamples, block, method, seed, chunk, confidence=0.95):
+    excess = returns - bench[:, None]
+    means, sharpes = [], []
+    for index in range(-(-n_resamples // chunk)):
+        size = min(chunk, n_resamples - index * chunk)
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+        for months in bootstrap.resample_indices(rng, size, len(returns), block, method):
+            drawn = returns[months]
+            means.append(np.nanmean(excess[months], axis=0))
+            sharpes.append(np.nanmean(drawn, axis=0) / np.nanstd(drawn, axis=0, ddof=1) * np.sqrt(12))
+    tails = [(1 - confidence) / 2 * 100, (1 + confidence) / 2 * 100]
+    means, sharpes = np.array(means), np.array(sharpes)
+    return np.percentile(means, tails, axis=0), np.percentile(sharpes, tails, axis=0), (means <= 0).mean(axis=0)
+
+
+@pytest.mark.parametrize("method, block", [("stationary", 6), ("block", 4)])
+def test_matches_resampling_month_by_month(monkeypatch, method, block):
+    rng = np.random.default_rng(3)
+    returns = rng.normal(0.01, 0.05, (60, 4))
+    returns[rng.random(returns.shape) < 0.05] = np.nan
+    bench = rng.normal(0.008, 0.04, 60)
+    # Several chunks, and a strategy block narrower than the matrix
+    monkeypatch.setattr(bootstrap, "CHUNK", 150)
+    monkeypatch.setattr(bootstrap, "BLOCK_VALUES", 1000)
+
+    table = bootstrap.bootstrap(returns, bench, 400, block, method, seed=11)
+    (mean_low, mean_high), (sharpe_low, sharpe_high), share = naive_bootstrap(returns, bench, 400, block, method,
+                                                                              11, 150)
+    np.testing.assert_allclose(table["mean_excess_low"], mean_low, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(table["mean_excess_high"], mean_high, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(table["sharpe_low"], sharpe_low, rtol=1e-9)
+    np.testing.assert_allclose(table["sharpe_high"], sharpe_high, rtol=1e-9)
+    np.testing.assert_allclose(table["share_not_positive"], share)
+    np.testing.assert_allclose(table["mean_excess"], np.nanmean(returns - bench[:, None], axis=0))
+
+
+def test_same_result_for_any_number_of_workers(monkeypatch):
+    rng = np.random.default_rng(5)
+    returns = rng.normal(0.01, 0.05, (48, 3))
+    bench = rng.normal(0.008, 0.04, 48)
+    # Five chunks to spread over the pool
+    monkeypatch.setattr(bootstrap, "CHUNK", 100)
+    serial = bootstrap.bootstrap(returns, bench, 500, seed=2)
+    for workers in (2, 3):
+        parallel = bootstrap.bootstrap(returns, bench, 500, seed=2, workers=workers)
+        np.testing.assert_array_equal(parallel.to_numpy(), serial.to_numpy())
+    counts = bootstrap.draw_counts(500, 48, seed=2, chunk=100)
+    assert counts.shape == (500, 48) and (counts.sum(axis=1) == 48).all()
+
+
+def test_block_resamples_are_wrapped_runs():
+    rng = np.random.default_rng(0)
+    indices = bootstrap.resample_indices(rng, 50, 20, block=5, method="block")
+    runs = indices.reshape(50, 4, 5)
+    assert ((runs[..., 1:] - runs[..., :-1]) % 20 == 1).all()
+    stationary = bootstrap.resample_indices(rng, 2000, 120, block=6)
+    breaks = ((stationary[:, 1:] - stationary[:, :-1]) % 120 != 1).mean()
+    assert 1 / 6 - 0.02 < breaks < 1 / 6 + 0.02
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import costs
+import holdings
+
+# Turnover and costs against rebalances worked out by hand.
+TICKERS = np.array(["A", "B", "C", "D"])
+A, B, C, D = range(4)
+
+
+def results_frame(rows):
+    """Results frame from (top_n, formation_month, ids, portfolio_return) rows."""
+    top_n, months, ids, returns = zip(*rows)
+    return pd.DataFrame({"top_n": top_n, "stride": 1, "formation_month": months,
+                         **holdings.as_columns(np.array(ids)), "portfolio_return": returns})
+
+
+def test_apply_hand_worked():
+    # Two strategies interleaved and out of date order, like a combined sweep file
+    results_df = results_frame([
+        (3, "2020-02", [A, D, -1], 0.02),
+        (2, "2020-03", [B, C, -1], 0.0),
+        (2, "2020-01", [A, B, -1], 0.01),
+        (3, "2020-01", [A, B, C], -0.01),
+        (2, "2020-02", [B, C, -1], 0.03),
+    ])
+    # 10 bps on everything, C also pays half of a 20 bps spread; unknown tickers are ignored
+    net_df = costs.apply(results_df, TICKERS, bps=10, spreads={"C": 20, "ZZZ": 50})
+    assert holdings.columns_of(net_df) == []
+
+    # top_2: buy A and B from cash; swap A for C; hold
+    # top_3: buy A, B, C from cash; keep A (1/3 -> 1/2), sell B and C, buy D
+    turnover = [1 / 6 + 1 / 2, 0, 1, 1, 1 / 2]
+    cost = [(1 / 6 + 1 / 2 + 1 / 3) * 0.001 + 1 / 3 * 0.002, 0, 0.001, (0.001 + 0.001 + 0.002) / 3,
+            0.5 * 0.002 + 0.5 * 0.001]
+    np.testing.assert_allclose(net_df["turnover"], turnover)
+    np.testing.assert_allclose(net_df["cost"], cost)
+    np.testing.assert_allclose(net_df["net_return"],
+                               (1 + results_df["portfolio_return"]) * (1 - np.array(cost)) - 1)
+
+    summary = costs.summary(net_df).set_index("top_n")
+    assert summary.loc[2, "mean_turnover"] == pytest.approx(0.5)
+    assert summary.loc[3, "annual_cost"] == pytest.approx((cost[0] + cost[3]) / 2 * 12)
+
+
+def test_overlapping_cohorts_trade_their_share():
+    results_df = results_frame([(1, f"2020-0{m + 1}", [ticker], 0.0) for m, ticker in enumerate([A, B, C, A])])
+    net_df = costs.apply(results_df, TICKERS, bps=10, spreads={"C": 20}, holding=2)
+    # The second cohort still buys from cash; later ones replace the cohort formed 2 months before
+    np.testing.assert_allclose(net_df["turnover"], [1, 0.5, 0.5, 0.5])
+    np.testing.assert_allclose(net_df["cost"], [0.001, 0.0005, (0.002 + 0.001) / 2, 0.001])
@@ -0,0 +1,23 @@
+import numpy as np
+
+import deltas
+import membership
+
+# Delta-encoded constituent history against the full compiled index.
+
+
+def test_delta_round_trip(index):
+    _, daily_csv, _, _ = index
+    compiled = membership.compile_membership(daily_csv)
+    history = deltas.DeltaHistory.from_index(compiled, keyframe_every=5)
+    expanded = history.to_index()
+    np.testing.assert_array_equal(expanded.bitmap, compiled.bitmap)
+    np.testing.assert_array_equal(expanded.dates, compiled.dates)
+
+    rng = np.random.default_rng(0)
+    days = compiled.dates[0] + rng.integers(-10, (compiled.dates[-1] - compiled.dates[0]).astype(int) + 10, 40)
+    for day in days:
+        assert history.constituents(day) == compiled.constituents(day)
+    for start, end in zip(days[:-1], days[1:]):
+        before, after = set(compiled.constituents(start)), set(compiled.constituents(end))
+        assert history.changes_between(start, end) == (sorted(after - before), sorted(before - after))
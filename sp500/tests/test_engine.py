@@ -0,0 +1,41 @@
+
+import numpy as np
+import pandas as pd
+
+import engine
+import holdings
+import membership
+
+# The vectorized engine against a month-by-month loop like the stage scripts'.
+
+
+def names_view(results_df, members):
+    return holdings.string_view(results_df, members.tickers).reset_index(drop=True)
+
+
+def loop_backtest(members, provider, top_n, lag=2):
+    """The stage scripts' loop: rank each formation month's constituents by that month's return."""
+    close = provider.close_panel(members.tickers.tolist())
+    close.index = close.index.to_period("M")
+    returns = close.pct_change(fill_method=None)
+    rows = []
+    first, last = members.dates[0].astype("datetime64[M]"), members.dates[-1].astype("datetime64[M]")
+    for snapshot in np.arange(first, last):
+        formation = pd.Period(str(snapshot + lag), "M")
+        if formation + 1 not in returns.index:
+            continue
+        universe = members.constituents((snapshot + 1).astype("datetime64[D]") - 1)
+        signal = returns.loc[formation].reindex(universe).dropna()
+        top = signal.sort_values(ascending=False, kind="stable").index[:top_n].tolist()
+        portfolio_return = returns.loc[formation + 1].reindex(top).mean()
+        if np.isfinite(portfolio_return):
+            rows.append((str(formation), ",".join(top), portfolio_return))
+    return pd.DataFrame(rows, columns=["formation_month", f"top_{top_n}", "portfolio_return"])
+
+
+def test_engine_reproduces_loop(index):
+    month_end_csv, _, provider, _ = index
+    members = membership.load_membership(month_end_csv)
+    engine_df = names_view(engine.run_backtest(month_end_csv, top_n=5, provider=provider), members)
+    loop_df = loop_backtest(members, provider, 5)
+    pd.testing.assert_frame_equal(engine_df, loop_df, check_exact=False)
@@ -0,0 +1,188 @@
+import sys
+import time
+import types
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+import instrument
+from fetcher import Fetcher, TokenBucket
+from providers import HttpProvider, MemoryProvider, PartialDownload, RateLimited, YahooProvider
+
+# The rate-limited fetcher: token bucket, retries with backoff, and the
+# network providers against local stand-ins for their servers.
+
+
+def bars(periods=12, start="2020-01-01"):
+    close = [float(i) for i in range(1, periods + 1)]
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1e6},
+                        index=pd.date_range(start, periods=periods, freq="MS"))
+
+
+def test_token_bucket_holds_the_rate():
+    bucket = TokenBucket(rate=100, burst=5)
+    start = time.monotonic()
+    bucket.acquire(5)
+    assert time.monotonic() - start < 0.02
+
+    # 10 more at 100/s
+    for _ in range(10):
+        bucket.acquire()
+    assert 0.08 < time.monotonic() - start < 0.3
+
+    # A batch larger than the burst waits for a full bucket, then leaves it in debt
+    bucket.acquire(15)
+    assert bucket.tokens < 0
+    before = time.monotonic()
+    bucket.acquire()
+    assert time.monotonic() - before > 0.08
+
+
+class Flaky(MemoryProvider):
+    """Throttles the first `throttled` calls, then errors on tickers starting with ERR."""
+
+    def __init__(self, frames, throttled=0):
+        super().__init__(frames)
+        self.throttled = throttled
+        self.calls = []
+
+    def download(self, tickers, start, end, interval="1mo"):
+        self.calls.append(list(tickers))
+        if len(self.calls) <= self.throttled:
+            raise RateLimited("slow down")
+        found = super().download(tickers, start, end, interval)
+        failed = [ticker for ticker in tickers if ticker.startswith("ERR")]
+        if failed:
+            raise PartialDownload({ticker: found[ticker] for ticker in found if ticker not in failed}, failed)
+        return found
+
+
+def test_throttled_requests_back_off_and_retry():
+    instrument.reset()
+    provider = Flaky({"A": bars(), "B": bars()}, throttled=2)
+    frames, missing = Fetcher(provider, rate=1000, backoff=0.01).fetch(["A", "B", "GONE"], None, None)
+    assert sorted(frames) == ["A", "B"] and missing == ["GONE"]
+    assert len(provider.calls) == 3
+    counters = instrument.snapshot()["counters"]
+    assert counters["rate_limited"] == 2 and counters["requests"] == 3
+
+
+def test_partial_downloads_retry_only_the_failed_tickers():
+    provider = Flaky({"A": bars(), "ERR1": bars()})
+    frames, missing = Fetcher(provider, rate=1000, max_retries=2, backoff=0).fetch(["A", "ERR1"], None, None)
+    assert list(frames) == ["A"] and missing == ["ERR1"]
+    assert provider.calls == [["A", "ERR1"], ["ERR1"], ["ERR1"]]
+
+
+def test_retries_give_up_after_max_retries():
+    provider = Flaky({"A": bars()}, throttled=10)
+    frames, missing = Fetcher(provider, rate=1000, max_retries=3, backoff=0).fetch(["A"], None, None)
+    assert frames == {} and missing == ["A"]
+    assert len(provider.calls) == 4
+
+
+@pytest.fixture
+def price_server():
+    """A local server in HttpProvider's layout: A and B have bars, SLOW is throttled once, the rest 404."""
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            hits.append(path)
+            ticker = path.rsplit("/", 1)[-1][:-4]
+            if ticker == "SLOW" and hits.count(path) == 1:
+                self.send_response(429)
+                self.end_headers()
+                return
+            if ticker not in ("A", "B", "SLOW"):
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = bars().rename_axis("Date").to_csv().encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", hits
+    server.shutdown()
+    server.server_close()
+
+
+def test_http_provider_against_local_server(price_server):
+    url, hits = price_server
+    instrument.reset()
+    fetcher = Fetcher(HttpProvider(url), workers=3, rate=1000, backoff=0.01)
+    frames, missing = fetcher.fetch(["A", "B", "SLOW", "GONE"], "2020-01-01", "2020-07-01")
+    assert sorted(frames) == ["A", "B", "SLOW"] and missing == ["GONE"]
+    pd.testing.assert_frame_equal(frames["A"], bars().rename_axis("Date"), check_freq=False)
+    assert hits.count("/1mo/SLOW.csv") == 2
+    counters = instrument.snapshot()["counters"]
+    assert counters["price_server_requests"] == 5 and counters["rate_limited"] == 1 and counters["price_server_bytes"] > 0
+
+
+@pytest.fixture
+def fake_yfinance(monkeypatch):
+    """yfinance stand-in whose Ticker.history sleeps, tracks concurrency and raises like the real one."""
+    state = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+
+    class YFRateLimitError(Exception):
+        pass
+
+    class YFPricesMissingError(Exception):
+        pass
+
+    class Ticker:
+
+        def __init__(self, ticker, session=None):
+            self.ticker = ticker
+
+        def history(self, start=None, end=None, interval="1d", auto_adjust=True, actions=True, raise_errors=False):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.05)
+            with lock:
+                state["active"] -= 1
+            if self.ticker.startswith("RL"):
+                raise YFRateLimitError("Too Many Requests. Rate limited. Try after a while.")
+            if self.ticker.startswith("DEAD"):
+                raise YFPricesMissingError(f"${self.ticker}: possibly delisted; no price data found")
+            if self.ticker.startswith("ERR"):
+                raise ConnectionError("connection reset")
+            frame = bars()
+            frame.index = frame.index.tz_localize("America/New_York")
+            return frame
+
+    monkeypatch.setitem(sys.modules, "yfinance", types.SimpleNamespace(Ticker=Ticker))
+    return state
+
+
+def test_yahoo_requests_run_concurrently(fake_yfinance):
+    provider = YahooProvider()
+    provider.batch_size = 2
+    frames, missing = Fetcher(provider, workers=4, rate=1000).fetch([f"T{i}" for i in range(8)], None, None)
+    assert len(frames) == 8 and missing == []
+    assert frames["T0"].index.tz is None
+    assert fake_yfinance["peak"] > 1
+
+
+def test_yahoo_errors_are_classified(fake_yfinance):
+    provider = YahooProvider()
+    with pytest.raises(RateLimited):
+        provider.download(["A", "RL1"], None, None)
+    with pytest.raises(PartialDownload) as raised:
+        provider.download(["A", "DEAD1", "ERR1"], None, None)
+    assert list(raised.value.frames) == ["A"] and raised.value.failed == ["ERR1"]
+    assert list(provider.download(["A", "DEAD1"], None, None)) == ["A"]
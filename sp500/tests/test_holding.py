@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+import engine
+import holdings
+import membership
+
+# Overlapping K-month holdings against averaging the live cohorts by hand.
+
+
+@pytest.mark.parametrize("top_n, stride, holding", [(4, 1, 3), (5, 1, 6), (3, 2, 4), (5, 6, 6)])
+def test_overlapping_cohorts_match_a_loop(index, top_n, stride, holding):
+    month_end_csv, _, provider, _ = index
+    members = membership.load_membership(month_end_csv)
+    months = engine.month_grid(members, history=holding - 1)
+    returns = engine.load_returns(members, months, provider)
+    labels = [str(month) for month in months]
+
+    # The cohorts on their own, one formed every `stride` months
+    formed = engine.backtest(members, returns, months, top_n, stride)
+    cohorts = dict(zip(formed["formation_month"], formed[holdings.columns_of(formed)].to_numpy()))
+
+    held = engine.backtest(members, returns, months, top_n, stride, holding=holding)
+    assert held["formation_month"].is_monotonic_increasing and len(held) >= len(formed)
+    for month, portfolio_return in zip(held["formation_month"], held["portfolio_return"]):
+        row = labels.index(month)
+        live = [cohorts[labels[row - k]] for k in range(holding) if labels[row - k] in cohorts]
+        expected = np.mean([np.nanmean(returns[row + 1, ids[ids >= 0]]) for ids in live])
+        assert portfolio_return == pytest.approx(expected)
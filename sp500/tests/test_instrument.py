@@ -0,0 +1,61 @@
+import json
+import time
+
+import engine
+import instrument
+
+# Phase timings and counters, and their totals across worker processes.
+
+
+def test_phases_and_counters_accumulate():
+    instrument.reset()
+    for _ in range(3):
+        with instrument.phase("download"):
+            time.sleep(0.01)
+    instrument.count("requests", 5)
+    instrument.count("requests")
+    instrument.count("store_hits")
+    report = instrument.snapshot()
+    assert report["phases"]["download"]["calls"] == 3
+    assert report["phases"]["download"]["seconds"] >= 0.03
+    assert report["counters"] == {"requests": 6, "store_hits": 1}
+
+
+def test_merge_adds_worker_snapshots():
+    instrument.reset()
+    with instrument.phase("ranking"):
+        pass
+    instrument.count("requests", 2)
+    worker = {"phases": {"ranking": {"seconds": 1.5, "calls": 4}, "prices": {"seconds": 2.0, "calls": 1}},
+              "counters": {"requests": 3, "store_misses": 7}, "months": {"2010-03": 0.25}, "peak_rss_mb": 12.0}
+    instrument.merge(worker)
+    instrument.merge(dict(worker, months={"2010-04": 0.5}, peak_rss_mb=None))
+
+    report = instrument.summary()
+    assert report["phases"]["ranking"]["calls"] == 9
+    assert report["phases"]["ranking"]["seconds"] >= 3.0
+    assert report["phases"]["prices"] == {"seconds": 4.0, "calls": 2}
+    assert report["counters"] == {"requests": 8, "store_misses": 14}
+    assert report["formation_months"] == 2
+    assert report["worker_peak_rss_mb"] == [12.0]
+
+
+def test_sharded_runs_report_every_workers_counters(index):
+    month_end_csv, _, provider, _ = index
+    instrument.reset()
+    results_df = engine.run_backtest(month_end_csv, top_n=5, provider=provider)
+    single = instrument.snapshot()["counters"]["formation_months"]
+    instrument.reset()
+    engine.run_backtest(month_end_csv, top_n=5, provider=provider, workers=3)
+    report = instrument.summary()
+    assert report["counters"]["formation_months"] == single >= len(results_df)
+    assert len(report["worker_peak_rss_mb"]) == 3
+
+
+def test_emit_saves_the_summary(tmp_path):
+    instrument.reset()
+    instrument.count("requests", 4)
+    path = str(tmp_path / "run.stats.json")
+    instrument.emit(path)
+    with open(path) as fh:
+        assert json.load(fh)["counters"] == {"requests": 4}
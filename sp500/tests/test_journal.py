@@ -0,0 +1,83 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import engine
+import journal
+import price_store
+from fetcher import Fetcher
+from providers import MemoryProvider
+
+# Checkpointed runs and fetches: journaled results equal plain ones, and a
+# resumed run redoes only what the journal does not hold.
+
+
+@pytest.mark.parametrize("run", [
+    lambda csv, provider, **kw: engine.run_backtest(csv, top_n=5, stride=2, lookback=3, provider=provider, **kw),
+    lambda csv, provider, **kw: engine.run_backtest(csv, top_n=4, stride=3, holding=3, provider=provider, **kw),
+    lambda csv, provider, **kw: engine.run_sweep(csv, [3, 5], [1, 2], [1, 6], provider=provider, skips=[0, 1], **kw),
+])
+def test_journaled_equals_single_process(index, tmp_path, run):
+    month_end_csv, _, provider, _ = index
+    single = run(month_end_csv, provider)
+    journaled = run(month_end_csv, provider, journal_path=str(tmp_path / "run.journal.jsonl"))
+    pd.testing.assert_frame_equal(journaled, single, check_dtype=False)
+
+
+def test_journal_resume_after_torn_line(index, tmp_path):
+    month_end_csv, _, provider, _ = index
+    path = str(tmp_path / "run.journal.jsonl")
+    single = engine.run_backtest(month_end_csv, top_n=5, provider=provider)
+    engine.run_backtest(month_end_csv, top_n=5, provider=provider, journal_path=path)
+
+    # Keep the first 10 months and half of the 11th, as a crash mid-write would
+    with open(path) as fh:
+        lines = fh.readlines()
+    with open(path, "w") as fh:
+        fh.writelines(lines[:10])
+        fh.write(lines[10][:len(lines[10]) // 2])
+    inputs = json.loads(lines[0])["inputs"]
+    assert len(journal.Journal(path, inputs, resume=True).entries) == 10
+    resumed = engine.run_backtest(month_end_csv, top_n=5, provider=provider, journal_path=path, resume=True)
+    pd.testing.assert_frame_equal(resumed, single, check_dtype=False)
+    assert len(journal.Journal(path, inputs, resume=True).entries) == len(lines)
+
+
+class CountingProvider(MemoryProvider):
+
+    def __init__(self, frames):
+        super().__init__(frames)
+        self.requested = []
+        self.ends = set()
+
+    def download(self, tickers, start, end, interval="1mo"):
+        self.requested += tickers
+        self.ends.add(end)
+        return super().download(tickers, start, end, interval)
+
+
+def test_fetch_resumes_on_a_later_day(tmp_path, monkeypatch):
+    close = np.arange(1.0, 13)
+    frames = {ticker: pd.DataFrame({"Close": close}, index=pd.date_range("2020-01-01", periods=12, freq="MS"))
+              for ticker in ["A", "B", "C", "D"]}
+    store = str(tmp_path)
+    provider = CountingProvider(frames)
+    monkeypatch.setattr(pd.Timestamp, "today", classmethod(lambda cls: pd.Timestamp("2021-03-01")))
+    price_store.fetch(["A", "B"], "2020-01-01", None, store_dir=store, fetcher=Fetcher(provider, rate=1000))
+
+    # Banned overnight; the default end is now a day later
+    monkeypatch.setattr(pd.Timestamp, "today", classmethod(lambda cls: pd.Timestamp("2021-03-02")))
+    provider.requested, provider.ends = [], set()
+    stored, _ = price_store.fetch(["A", "B", "C", "D"], "2020-01-01", None, store_dir=store, resume=True,
+                                  fetcher=Fetcher(provider, rate=1000))
+    assert provider.requested == ["C", "D"] and stored == ["C", "D"]
+    assert provider.ends == {"2021-03-02"}
+    assert price_store.stored_tickers(store_dir=store) == ["A", "B", "C", "D"]
+
+    # An explicit end is a different window
+    provider.requested = []
+    price_store.fetch(["A"], "2020-01-01", "2021-01-01", store_dir=store, resume=True,
+                      fetcher=Fetcher(provider, rate=1000))
+    assert provider.requested == ["A"]
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import engine
+import holdings
+import membership
+
+# The streamed membership index: every snapshot is kept, month-end masks
+# match the month-end file, and bad rows are reported.
+
+
+def names_view(results_df, members):
+    return holdings.string_view(results_df, members.tickers).reset_index(drop=True)
+
+
+def test_month_end_masks_ignore_mid_month_rows(index):
+    month_end_csv, daily_csv, provider, (pool, dates, bitmap) = index
+    daily = membership.compile_membership(daily_csv)
+    for date, ticker_string in membership.iter_rows(daily_csv):
+        assert sorted(daily.constituents(date)) == sorted(ticker_string.split(","))
+
+    month_ends = daily.month_ends()
+    expected = pd.DataFrame(bitmap, columns=pool)[daily.tickers.tolist()].to_numpy()
+    np.testing.assert_array_equal(daily.mask(month_ends), expected)
+    monthly = membership.compile_membership(daily_csv, period="M")
+    np.testing.assert_array_equal(monthly.mask(month_ends), expected)
+
+    on_month_ends = engine.run_backtest(month_end_csv, top_n=5, provider=provider)
+    on_daily = engine.run_backtest(daily_csv, top_n=5, provider=provider)
+    pd.testing.assert_frame_equal(names_view(on_daily, daily),
+                                  names_view(on_month_ends, membership.load_membership(month_end_csv)))
+
+
+def test_membership_rejects_bad_dates(tmp_path):
+    path = str(tmp_path / "bad.csv")
+    with open(path, "w") as fh:
+        fh.write('date,tickers\n2004-01-30,"A,B"\nnot a date,"A"\n')
+    with pytest.raises(ValueError, match="not a date"):
+        membership.compile_membership(path)
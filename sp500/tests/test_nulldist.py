@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+import engine
+import membership
+import nulldist
+
+# Random portfolios against the eligible names they are drawn from, and
+# the momentum portfolio's place in them.
+
+
+def test_random_portfolios_draw_distinct_eligible_names():
+    rng = np.random.default_rng(3)
+    eligible = rng.random((6, 40)) < 0.5
+    eligible[4] = False
+    eligible[5] = False
+    eligible[5, [7, 21]] = True
+    portfolios = nulldist.random_portfolios(eligible, draws=2000, top_n=5, seed=1)
+    assert portfolios.shape == (6, 2000, 5)
+
+    for month in range(4):
+        names = np.flatnonzero(eligible[month])
+        assert np.isin(portfolios[month], names).all()
+        assert (np.diff(np.sort(portfolios[month], axis=1), axis=1) > 0).all()
+        # Every eligible name is picked about top_n / names of the time
+        share = np.bincount(portfolios[month].ravel(), minlength=40)[names] / 2000
+        np.testing.assert_allclose(share, 5 / len(names), atol=0.05)
+
+    # Too few names: hold them all, padded like select_top; none: all -1
+    assert (portfolios[4] == -1).all()
+    assert (portfolios[5] == [7, 21, -1, -1, -1]).all()
+
+    again = nulldist.random_portfolios(eligible, draws=2000, top_n=5, seed=1)
+    np.testing.assert_array_equal(again, portfolios)
+
+
+def test_percentile_of_hand_worked():
+    distribution = np.array([[1.0, 2.0, 3.0, 4.0], [1.0, 2.0, np.nan, 2.0], [np.nan] * 4])
+    np.testing.assert_allclose(nulldist.percentile_of([2.5, 2.0, 1.0], distribution),
+                               [50.0, (1 + 0.5 * 2) / 3 * 100, np.nan])
+
+
+def test_null_distribution_against_the_backtest(index):
+    month_end_csv, _, provider, _ = index
+    members = membership.load_membership(month_end_csv)
+    months = engine.month_grid(members)
+    returns = engine.load_returns(members, months, provider)
+    frame, summary = nulldist.null_distribution(members, returns, months, top_n=5, draws=500, seed=4)
+
+    # The momentum column is the backtest's portfolio return
+    momentum = engine.backtest(members, returns, months, top_n=5)
+    assert frame["formation_month"].tolist() == momentum["formation_month"].tolist()
+    np.testing.assert_allclose(frame["momentum_return"], momentum["portfolio_return"])
+
+    # Recompute the null from the portfolios and the eligible names month by month
+    rows = engine.formation_rows(months, engine.formation_months(members))
+    universe = engine.universe_mask(members, months, rows, 2)
+    signal = engine.formation_signal(returns)[rows]
+    portfolios = nulldist.random_portfolios(universe & np.isfinite(signal), 500, 5, seed=4)
+    labels = [str(month) for month in months[rows]]
+    for month, row in zip(frame.itertuples(), [labels.index(label) for label in frame["formation_month"]]):
+        null = np.array([np.nanmean(returns[rows[row] + 1, ids[ids >= 0]]) for ids in portfolios[row]])
+        assert month.null_mean == pytest.approx(np.nanmean(null))
+        assert month.null_p50 == pytest.approx(np.nanmedian(null))
+        below = (null < month.momentum_return).sum() + 0.5 * (null == month.momentum_return).sum()
+        assert month.percentile == pytest.approx(below / np.isfinite(null).sum() * 100)
+
+    assert summary["months"] == len(frame)
+    assert summary["momentum_mean"] == pytest.approx(frame["momentum_return"].mean())
+    assert summary["months_above_median"] == pytest.approx((frame["percentile"] > 50).mean())
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+import price_store
+from fetcher import Fetcher
+from providers import MemoryProvider
+
+# The local store and the bulk validation built on it.
+
+
+def bars(start, periods):
+    close = np.arange(1.0, periods + 1)
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1e6},
+                        index=pd.date_range(start, periods=periods, freq="MS"))
+
+
+def test_store_round_trip_and_windows(tmp_path):
+    store = str(tmp_path)
+    price_store.write_ticker("OLD", bars("2005-01-01", 24), store_dir=store)
+    price_store.write_ticker("NEW", bars("2010-01-01", 12), store_dir=store)
+
+    close = price_store.load_prices(["OLD", "NEW", "GONE"], "2005-06-01", "2005-09-01", store_dir=store)
+    assert list(close.columns) == ["OLD"]
+    assert close["OLD"].tolist() == [6.0, 7.0, 8.0]
+
+    # [start, end) against each ticker's first and last bar, from the index alone
+    assert price_store.available(["OLD", "NEW", "GONE"], "2006-12-01", "2010-01-01", store_dir=store) == ["OLD"]
+    assert price_store.available(["OLD", "NEW"], "2006-12-02", "2010-01-02", store_dir=store) == ["NEW"]
+    assert price_store.available(["OLD", "NEW"], "2007-01-01", "2010-01-01", store_dir=store) == []
+
+
+def test_availability_follows_rewrites(tmp_path):
+    store = str(tmp_path)
+    price_store.write_ticker("OLD", bars("2005-01-01", 12), store_dir=store)
+    assert price_store.available(["OLD"], "2006-06-01", "2007-01-01", store_dir=store) == []
+    before = price_store.store_digest(store_dir=store)
+
+    price_store.write_ticker("OLD", bars("2005-01-01", 24), store_dir=store)
+    assert price_store.available(["OLD"], "2006-06-01", "2007-01-01", store_dir=store) == ["OLD"]
+    assert price_store.store_digest(store_dir=store) != before
+
+
+def test_bulk_download_splits_found_and_missing():
+    provider = MemoryProvider({"OLD": bars("2005-01-01", 24), "NEW": bars("2010-01-01", 12)})
+    provider.batch_size = 2
+    frames, missing = price_store.bulk_download(["OLD", "NEW", "GONE"], "2005-01-01", "2006-01-01",
+                                                fetcher=Fetcher(provider, rate=1000))
+    assert list(frames) == ["OLD"] and len(frames["OLD"]) == 12
+    assert missing == ["NEW", "GONE"]
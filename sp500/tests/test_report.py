@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import benchmark
+import engine
+import holdings
+import report
+
+# Headless charts: one per strategy of a results file, written to disk.
+
+
+@pytest.fixture
+def spy(tmp_path):
+    dates = pd.bdate_range("2003-01-01", "2009-12-31")
+    closes = 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0.0003, 0.01, len(dates))))
+    path = str(tmp_path / "SPY.csv")
+    pd.DataFrame({"Date": dates.strftime("%Y-%m-%d"), "Close": closes}).to_csv(path, index=False)
+    return benchmark.load(path)
+
+
+def test_holding_returns_sit_at_the_end_of_the_holding_month():
+    returns = report.holding_returns(["2004-03", "2004-01", "2004-02"], [0.03, 0.01, 0.02])
+    assert returns.index.strftime("%Y-%m-%d").tolist() == ["2004-02-29", "2004-03-31", "2004-04-30"]
+    assert returns.tolist() == [0.01, 0.02, 0.03]
+
+
+def test_sweep_charts_per_strategy(index, tmp_path):
+    month_end_csv, _, provider, _ = index
+    path = str(tmp_path / "sweep.csv")
+    results_df = engine.run_sweep(month_end_csv, [3, 5], [1, 2], [1, 6], path, provider=provider)
+    charts = report.strategy_charts(path, top_n=5)
+    assert len(charts) == 4
+    assert charts[0]["name"] == "top5_stride1_look1_skip0"
+    assert charts[0]["title"].startswith("Momentum Portfolio (top 5")
+    first = results_df[(results_df["top_n"] == 5) & (results_df["stride"] == 1) & (results_df["lookback"] == 1)]
+    np.testing.assert_allclose(charts[0]["returns"].to_numpy(), first["portfolio_return"].to_numpy())
+
+    # A single backtest is named after its parameters, or after its file when it records none
+    single = str(tmp_path / "mom10_comb.csv")
+    engine.run_backtest(month_end_csv, top_n=4, stride=6, output=single, provider=provider)
+    assert [chart["name"] for chart in report.strategy_charts(single)] == ["top4_stride6_look1_skip0_hold1"]
+    os.remove(holdings.sidecar_path(single))
+    assert [chart["name"] for chart in report.strategy_charts(single)] == ["mom10_comb"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_render_all_writes_every_chart(index, tmp_path, spy, workers):
+    month_end_csv, _, provider, _ = index
+    path = str(tmp_path / "sweep.csv")
+    engine.run_sweep(month_end_csv, [3], [1, 2], [1], path, provider=provider)
+    charts = report.strategy_charts(path) + [{"name": "spy", "title": "SPY", "returns": None, "benchmark": True}]
+    out_dir = str(tmp_path / "charts")
+    paths = report.render_all(charts, spy, out_dir, "svg", workers)
+    assert sorted(os.listdir(out_dir)) == sorted(os.path.basename(path) for path in paths)
+    assert len(paths) == 3 and all(os.path.getsize(path) > 0 for path in paths)
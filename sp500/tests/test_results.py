@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import engine
+import holdings
+import results
+
+pytest.importorskip("pyarrow")
+
+# Columnar results: column and strategy filters, round trips through CSV,
+# and imports that never guess run parameters.
+GRID = dict(top_ns=[3, 5], strides=[1, 2], lookbacks=[1, 6])
+
+
+@pytest.fixture(scope="module")
+def sweep(index, tmp_path_factory):
+    month_end_csv, _, provider, _ = index
+    path = str(tmp_path_factory.mktemp("results") / "sweep.arrow")
+    results_df = engine.run_sweep(month_end_csv, GRID["top_ns"], GRID["strides"], GRID["lookbacks"], path,
+                                  provider=provider)
+    return path, results_df
+
+
+def test_read_filters_columns_and_strategies(sweep):
+    path, results_df = sweep
+    frame = results.read(path, ["formation_month", "portfolio_return"], top_n=5, lookback=[1, 6], stride=2)
+    assert list(frame.columns) == ["formation_month", "portfolio_return"]
+    expected = results_df[(results_df["top_n"] == 5) & (results_df["stride"] == 2)]
+    np.testing.assert_array_equal(frame["portfolio_return"], expected["portfolio_return"])
+    assert frame["formation_month"].dt.strftime("%Y-%m").tolist() == expected["formation_month"].tolist()
+
+    ids = results.arrays(path, ["holding_1", "portfolio_return"], top_n=3)
+    assert ids["holding_1"].dtype == np.int32 and len(ids["holding_1"]) == (results_df["top_n"] == 3).sum()
+    assert len(results.strategies(path)) == 8
+    assert results.saved_params(path) == {"skip": 0, "holding": 1, "lag": 2}
+    assert results.metadata(path)["kind"] == "sweep"
+
+
+def test_load_round_trips_through_csv(sweep, tmp_path):
+    path, _ = sweep
+    loaded, tickers, kind = results.load(path)
+    csv_path = str(tmp_path / "sweep.csv")
+    results.export_csv(loaded, tickers, csv_path, holding=1, lag=2)
+    again, _, again_kind = results.load(csv_path, tickers)
+    assert kind == again_kind == "sweep"
+    pd.testing.assert_frame_equal(again, loaded, check_dtype=False)
+
+
+def test_import_requires_unrecorded_parameters(index, tmp_path):
+    month_end_csv, _, provider, _ = index
+    csv_path = str(tmp_path / "res_12_comb.csv")
+    engine.run_backtest(month_end_csv, top_n=5, stride=12, output=csv_path, provider=provider)
+    results_df, _, kind = results.load(csv_path)
+    # Written by the engine: everything is in the sidecar
+    assert results.import_params(csv_path, results_df, kind) == dict(top_n=5, stride=12, lookback=1, skip=0,
+                                                                     holding=1, lag=2)
+    with pytest.raises(ValueError, match="stride=12"):
+        results.import_params(csv_path, results_df, kind, stride=1)
+
+    # Like the stage scripts' files: only top_N is recorded
+    holdings.Holdings.from_frame(results_df, results.load(csv_path)[1]).save(holdings.sidecar_path(csv_path))
+    with pytest.raises(ValueError, match="does not record stride, lookback, skip, holding, lag"):
+        results.import_params(csv_path, results_df, kind)
+    assert results.import_params(csv_path, results_df, kind, stride=12, lookback=1, skip=0, holding=1,
+                                 lag=2)["top_n"] == 5
+
+    target = str(tmp_path / "r12.arrow")
+    refused = subprocess.run([sys.executable, "results.py", "import", csv_path, target], capture_output=True,
+                             text=True, cwd=os.path.dirname(os.path.abspath(engine.__file__)))
+    assert refused.returncode == 2 and "--stride" in refused.stderr
@@ -0,0 +1,18 @@
+import pandas as pd
+import pytest
+
+import engine
+
+# Formation months split across worker processes against one process.
+RUNS = [
+    lambda csv, provider, **kw: engine.run_backtest(csv, top_n=5, stride=2, lookback=3, provider=provider, **kw),
+    lambda csv, provider, **kw: engine.run_backtest(csv, top_n=4, stride=3, holding=3, provider=provider, **kw),
+    lambda csv, provider, **kw: engine.run_sweep(csv, [3, 5], [1, 2], [1, 6], provider=provider, skips=[0, 1], **kw),
+]
+
+
+@pytest.mark.parametrize("run", RUNS)
+@pytest.mark.parametrize("workers", [2, 3, 7])
+def test_sharded_equals_single_process(index, run, workers):
+    month_end_csv, _, provider, _ = index
+    pd.testing.assert_frame_equal(run(month_end_csv, provider, workers=workers), run(month_end_csv, provider))
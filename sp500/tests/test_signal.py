@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+import engine
+
+# Lookback signals read off the log-return prefix sums against compounding
+# each window directly.
+
+
+def naive_signal(returns, lookback, skip):
+    signal = np.full(returns.shape, np.nan)
+    for row in range(len(returns)):
+        start, end = row - skip - lookback + 1, row - skip + 1
+        if start >= 0:
+            signal[row] = np.prod(1 + returns[start:end], axis=0) - 1
+    return signal
+
+
+@pytest.mark.parametrize("lookback, skip", [(1, 0), (3, 0), (11, 1), (12, 1), (6, 3)])
+def test_prefix_sum_signal_matches_compounding(lookback, skip):
+    rng = np.random.default_rng(lookback * 10 + skip)
+    returns = rng.normal(0.01, 0.08, (60, 25))
+    # Gaps: a window with a missing month has no signal
+    returns[rng.random(returns.shape) < 0.03] = np.nan
+    np.testing.assert_allclose(engine.formation_signal(returns, lookback, skip),
+                               naive_signal(returns, lookback, skip), rtol=1e-9, atol=1e-12)
+
+
+def test_total_loss_only_zeroes_its_own_windows():
+    returns = np.array([[0.1], [-1.0], [0.2], [0.3], [0.05]])
+    signal = engine.formation_signal(returns, 2)
+    np.testing.assert_allclose(signal[1:3, 0], [-1.0, -1.0], atol=1e-9)
+    np.testing.assert_allclose(signal[3:, 0], [1.2 * 1.3 - 1, 1.3 * 1.05 - 1])
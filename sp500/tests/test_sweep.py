@@ -0,0 +1,24 @@
+import numpy as np
+
+import engine
+import holdings
+import membership
+
+# One pass over the grid against a backtest per configuration.
+
+
+def test_sweep_equals_per_config_backtests(index):
+    month_end_csv, _, provider, _ = index
+    members = membership.load_membership(month_end_csv)
+    grid = dict(top_ns=[3, 5], strides=[1, 3], lookbacks=[1, 6], skips=[0, 1])
+    months = engine.month_grid(members, history=engine._history(grid))
+    returns = engine.load_returns(members, months, provider)
+    swept = engine.sweep(members, returns, months, grid["top_ns"], grid["strides"], grid["lookbacks"], skips=grid["skips"])
+
+    for (top_n, stride, lookback, skip), rows in swept.groupby(["top_n", "stride", "lookback", "skip"]):
+        single = engine.backtest(members, returns, months, top_n, stride, lookback=lookback, skip=skip)
+        rows = rows.reset_index(drop=True)
+        assert rows["formation_month"].tolist() == single["formation_month"].tolist()
+        np.testing.assert_allclose(rows["portfolio_return"], single["portfolio_return"])
+        columns = holdings.id_columns(top_n)
+        np.testing.assert_array_equal(rows[columns].to_numpy(), single[columns].to_numpy())
@@ -0,0 +1,132 @@
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+
+import engine
+import holdings
+import membership
+import symbols
+from fetcher import Fetcher
+from providers import MemoryProvider, PartialDownload
+
+# The symbol registry: what it skips, for which windows, and what survives
+# several processes saving it.
+DAY = symbols.DAY
+
+
+def monthly(start, periods):
+    return pd.DataFrame({"Close": np.arange(1.0, periods + 1)}, index=pd.date_range(start, periods=periods, freq="MS"))
+
+
+def test_empty_windows_skip_only_requests_inside_them(tmp_path):
+    path = str(tmp_path / "symbols.json")
+    frames = {"OLD": monthly("2004-01-01", 36), "NEW": monthly("2015-01-01", 60)}
+    fetcher = Fetcher(MemoryProvider(frames), registry=symbols.SymbolRegistry(path=path), backoff=0)
+
+    # OLD was delisted and NEW not yet listed: empty here, but not in other windows
+    assert fetcher.fetch(["OLD", "NEW"], "2012-01-01", "2013-01-01") == ({}, ["OLD", "NEW"])
+    registry = symbols.load(path)
+    assert registry.is_dead("OLD", "2012-03-01", "2012-06-01")
+    assert not registry.is_dead("OLD", "2005-01-01", "2006-01-01")
+    assert not registry.is_dead("OLD", None, None)
+    found, missing = Fetcher(MemoryProvider(frames), registry=registry, backoff=0).fetch(["OLD", "NEW"], "2005-01-01",
+                                                                                         "2006-01-01")
+    assert list(found) == ["OLD"] and missing == ["NEW"]
+    assert registry.status("OLD") == "valid"
+
+    # Overlapping empty windows merge, each symbol's with its own; an unbounded miss covers everything
+    registry.record({}, ["NEW", "LATER"], "2005-06-01", "2008-01-01", now=registry.entries["NEW"]["checked"] + DAY)
+    assert registry.is_dead("NEW", "2005-01-01", "2007-01-01") and not registry.is_dead("NEW", "2004-01-01", None)
+    assert not registry.is_dead("LATER", "2005-01-01", "2007-01-01")
+    registry.record({}, ["GONE"], None, None)
+    assert registry.is_dead("GONE", "1990-01-01", "2030-01-01") and registry.is_dead("GONE")
+
+    # Past the TTL everything is requested again
+    assert not registry.is_dead("GONE", now=registry.entries["GONE"]["checked"] + 31 * DAY)
+
+
+def test_failed_requests_are_not_recorded_invalid(tmp_path):
+    frames = {"GOOD": monthly("2020-01-01", 2)}
+
+    class Flaky(MemoryProvider):
+        def download(self, tickers, start, end, interval="1mo"):
+            found = super().download(tickers, start, end, interval)
+            failed = [ticker for ticker in tickers if ticker.startswith("ERR")]
+            if failed:
+                raise PartialDownload(found, failed)
+            return found
+
+    registry = symbols.SymbolRegistry(path=str(tmp_path / "symbols.json"))
+    fetcher = Fetcher(Flaky(frames), registry=registry, max_retries=1, backoff=0)
+    found, missing = fetcher.fetch(["GOOD", "ERR1", "GONE"], None, None)
+    assert list(found) == ["GOOD"] and missing == ["ERR1", "GONE"]
+    assert registry.status("GOOD") == "valid"
+    assert registry.status("GONE") == "invalid"
+    assert registry.status("ERR1") is None
+
+
+def _save_symbols(path, prefix):
+    for i in range(20):
+        registry = symbols.load(path)
+        registry.record({f"{prefix}{i}": f"{prefix}{i}"}, [f"{prefix}DEAD{i}"])
+        registry.save()
+
+
+def test_concurrent_saves_keep_every_entry(tmp_path):
+    path = str(tmp_path / "symbols.json")
+    registry = symbols.load(path)
+    registry.record({"OLD": "OLD"}, ["GONE"])
+    registry.save()
+
+    workers = [multiprocessing.Process(target=_save_symbols, args=(path, prefix)) for prefix in "AB"]
+    for worker in workers:
+        worker.start()
+    # An earlier copy of the registry saving late must not drop what the workers recorded
+    registry.forget("GONE")
+    for worker in workers:
+        worker.join()
+    registry.save()
+
+    saved = symbols.load(path)
+    assert "GONE" not in saved.entries
+    for prefix in "AB":
+        assert all(saved.status(f"{prefix}{i}") == "valid" for i in range(20))
+        assert all(saved.status(f"{prefix}DEAD{i}") == "invalid" for i in range(20))
+    assert saved.status("OLD") == "valid"
+
+
+class NetworkMemory(MemoryProvider):
+    """In-memory prices sent through the fetcher and the registry like a network source."""
+
+    network = True
+
+
+def test_late_listings_survive_sharded_and_journaled_runs(index, tmp_path, monkeypatch):
+    month_end_csv, _, provider, (_, dates, _) = index
+    members = membership.load_membership(month_end_csv)
+    # Names the strategy picks in the last year only start trading two years in;
+    # windows before that come back empty for them
+    listed = pd.Timestamp(dates[0]) + pd.DateOffset(years=2)
+    picked = engine.run_backtest(month_end_csv, top_n=5, provider=provider)
+    late_rows = picked["formation_month"] >= str(listed.year + 1)
+    late = set(holdings.string_view(picked[late_rows], members.tickers).iloc[:, 1].str.split(",").sum())
+    frames = {ticker: frame[frame.index >= listed] if ticker in late else frame
+              for ticker, frame in provider.frames["1mo"].items()}
+    expected = engine.run_backtest(month_end_csv, top_n=5, provider=MemoryProvider(frames))
+    held = set(holdings.string_view(expected, members.tickers).iloc[:, 1].str.split(",").sum())
+    assert late & held
+
+    # Each run starts from an empty registry (symbols.json in the working directory) of its own
+    params = dict(top_n=5, stride=1, lookback=1)
+    runs = {
+        "journaled": lambda: engine.run_checkpointed(month_end_csv, "backtest", params, "run.journal.jsonl",
+                                                     provider=NetworkMemory(frames), chunk_months=12),
+        "sharded": lambda: engine.run_sharded(month_end_csv, "backtest", params, workers=3,
+                                              provider=NetworkMemory(frames)),
+    }
+    for name, run in runs.items():
+        (tmp_path / name).mkdir()
+        monkeypatch.chdir(tmp_path / name)
+        pd.testing.assert_frame_equal(run(), expected, check_dtype=False)
+        assert all(symbols.load().status(ticker) == "valid" for ticker in late)